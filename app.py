@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
-from dotenv import load_dotenv
 import logging
 
 from apps.auth.routes import router as auth_router
@@ -15,7 +15,7 @@ from apps.settings.routes import router as settings_router
 
 from core.rag.llm import llm
 from core.rag.vectore_store import get_vector_store
-from core.rag.incidents_vectorstore import incident_to_document, get_incident_vector_store
+from core.rag.incidents_vectorstore import add_incidents_to_vector_store, get_incident_vector_store
 from middlewares.rate_limiter import RateLimiter
 from core.config import settings
 from core.database import create_db_and_tables
@@ -27,14 +27,12 @@ from apps.incidents.models import Incident
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
 # Initialize FastAPI app
 app = FastAPI(
     title="Crime Analysis API",
     description="API for analyzing crime data using Gemini model",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     openapi_url="/api/openapi.json",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
@@ -197,18 +195,8 @@ async def populate_incident_vector_store():
                 logger.info("No incidents found to populate vector store.")
                 return
                 
-            # Get the vector store
-            vector_store = get_incident_vector_store()
-            
-            # Convert incidents to documents
-            documents = [incident_to_document(incident) for incident in incidents]
-            
-            # Add documents to vector store
-            if documents:
-                vector_store.add_documents(documents)
-                logger.info(f"Added {len(documents)} incidents to vector store.")
-            else:
-                logger.info("No documents created for vector store.")
+            # Embed in fixed-size batches rather than one request for every incident
+            add_incidents_to_vector_store(incidents)
                 
     except Exception as e:
         logger.error(f"Error populating incident vector store: {e}")
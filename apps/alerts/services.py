@@ -114,7 +114,7 @@ class AlertService:
             title=alert_data.title,
             description=alert_data.description,
             severity=alert_data.severity,
-            location=alert_data.location.dict(),
+            location=alert_data.location.model_dump(mode="json"),
             timestamp=datetime.utcnow(),
             source="predictive_algorithm",
             related_incidents=related_incidents,
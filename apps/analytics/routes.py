@@ -1,12 +1,13 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Optional, List, Dict, Any
-from sqlmodel import Session, select, func
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, Dict, Any
+from sqlmodel import Session, select
 from datetime import datetime, timedelta
-import json
 
 from apps.users.models import User
 from apps.incidents.models import Incident
-from core.database import get_session, engine
+from core.database import get_session, json_contains
 from core.utils.common import ResponseModel
 from core.utils.security import get_current_user
 from core.rag.analytics_service import AnalyticsService
@@ -14,6 +15,12 @@ from core.rag.incidents_vectorstore import get_similar_incidents
 
 router = APIRouter()
 
+# Accepted values for the enumerated query parameters
+_GROUP_BY_VALUES = ("day", "week", "month", "type", "district")
+_RESOLUTIONS = ("high", "medium", "low")
+_TREND_INTERVALS = ("daily", "weekly", "monthly")
+_TIME_FACTORS = ("hour_of_day", "day_of_week", "month_of_year")
+
 @router.get("/crime-statistics", response_model=dict)
 async def get_crime_statistics(
     start_date: str = Query(..., description="Start date for analysis period (YYYY-MM-DD)"),
@@ -49,7 +56,7 @@ async def get_crime_statistics(
             )
             
         # Validate group_by parameter
-        if group_by not in ["day", "week", "month", "type", "district"]:
+        if group_by not in _GROUP_BY_VALUES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -59,24 +66,21 @@ async def get_crime_statistics(
                 }
             )
         
-        # Query incidents within the date range
-        query = select(Incident).where(
-            Incident.date >= start,
-            Incident.date <= end
+        # Aggregate counts in the database; only an LLM sample is loaded as full rows.
+        # The LLM-backed analytics calls block, so they run in the threadpool to keep the
+        # event loop free and let a dashboard's parallel analytics requests overlap
+        stats = await run_in_threadpool(
+            AnalyticsService.generate_crime_statistics_sql,
+            session=session,
+            start_date=start,
+            end_date=end,
+            group_by=group_by,
+            district=district,
+            crime_type=crime_type
         )
         
-        # Apply optional filters
-        if district:
-            query = query.where(Incident.location["district"].as_string() == district)
-        
-        if crime_type:
-            query = query.where(Incident.type == crime_type)
-        
-        # Execute query
-        incidents = session.exec(query).all()
-        
         # If no incidents found, return empty statistics
-        if not incidents:
+        if stats is None:
             return ResponseModel.success(
                 data={
                     "timeframe": {
@@ -93,16 +97,6 @@ async def get_crime_statistics(
                 }
             )
         
-        # Use AnalyticsService to generate statistics with LLM enhancement
-        stats = AnalyticsService.generate_crime_statistics(
-            incidents=incidents,
-            start_date=start,
-            end_date=end,
-            group_by=group_by,
-            district=district,
-            crime_type=crime_type
-        )
-        
         return ResponseModel.success(data=stats)
         
     except Exception as e:
@@ -129,7 +123,7 @@ async def get_heatmap_data(
     """Get data for crime heatmap visualization with AI-enhanced hotspot detection"""
     try:
         # Validate resolution parameter
-        if resolution not in ["high", "medium", "low"]:
+        if resolution not in _RESOLUTIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -143,7 +137,7 @@ async def get_heatmap_data(
         query = select(Incident)
         
         if district:
-            query = query.where(Incident.location["district"].as_string() == district)
+            query = query.where(json_contains(Incident.location, {"district": district}))
             
         if crime_type:
             query = query.where(Incident.type == crime_type)
@@ -170,7 +164,8 @@ async def get_heatmap_data(
             )
         
         # Use AnalyticsService to generate heatmap data
-        heatmap_data = AnalyticsService.generate_heatmap_data(
+        heatmap_data = await run_in_threadpool(
+            AnalyticsService.generate_heatmap_data,
             incidents=incidents,
             resolution=resolution,
             district=district,
@@ -202,7 +197,8 @@ async def get_predictive_analysis(
     """Get predictive crime analysis using LLM and RAG"""
     try:
         # Use the analytics service to generate predictions
-        predictions = AnalyticsService.generate_predictive_analysis(
+        predictions = await run_in_threadpool(
+            AnalyticsService.generate_predictive_analysis,
             session=session,
             days_ahead=days_ahead,
             crime_type=crime_type,
@@ -262,7 +258,7 @@ async def get_trend_analysis(
             )
             
         # Validate interval parameter
-        if interval not in ["daily", "weekly", "monthly"]:
+        if interval not in _TREND_INTERVALS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -280,7 +276,7 @@ async def get_trend_analysis(
         
         # Apply optional filters
         if district:
-            query = query.where(Incident.location["district"].as_string() == district)
+            query = query.where(json_contains(Incident.location, {"district": district}))
         
         if crime_type:
             query = query.where(Incident.type == crime_type)
@@ -302,7 +298,8 @@ async def get_trend_analysis(
             )
         
         # Use AnalyticsService to generate trend analysis with LLM enhancement
-        trend_data = AnalyticsService.generate_trend_analysis(
+        trend_data = await run_in_threadpool(
+            AnalyticsService.generate_trend_analysis,
             incidents=incidents,
             start_date=start,
             end_date=end,
@@ -337,7 +334,7 @@ async def get_risk_factor_analysis(
         query = select(Incident)
         
         if district:
-            query = query.where(Incident.location["district"].as_string() == district)
+            query = query.where(json_contains(Incident.location, {"district": district}))
             
         if crime_type:
             query = query.where(Incident.type == crime_type)
@@ -558,16 +555,14 @@ async def get_time_pattern_analysis(
 ):
     """Analyze crime patterns across different time periods"""
     try:
-        valid_time_factors = ["hour_of_day", "day_of_week", "month_of_year"]
-        
         # Validate time factor
-        if time_factor not in valid_time_factors:
+        if time_factor not in _TIME_FACTORS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
                     "code": "invalid_parameters",
                     "message": "Invalid time factor specified",
-                    "details": f"Time factor must be one of: {', '.join(valid_time_factors)}"
+                    "details": f"Time factor must be one of: {', '.join(_TIME_FACTORS)}"
                 }
             )
         
@@ -575,7 +570,7 @@ async def get_time_pattern_analysis(
         query = select(Incident)
         
         if district:
-            query = query.where(Incident.location["district"].as_string() == district)
+            query = query.where(json_contains(Incident.location, {"district": district}))
             
         if crime_type:
             query = query.where(Incident.type == crime_type)
@@ -597,7 +592,8 @@ async def get_time_pattern_analysis(
             )
         
         # Use AnalyticsService to analyze time patterns
-        time_patterns = AnalyticsService.analyze_time_patterns(
+        time_patterns = await run_in_threadpool(
+            AnalyticsService.analyze_time_patterns,
             incidents=incidents,
             time_factor=time_factor,
             crime_type=crime_type,
@@ -618,3 +614,121 @@ async def get_time_pattern_analysis(
                 "message": f"Error analyzing time patterns: {str(e)}"
             }
         )
+
+@router.get("/dashboard", response_model=dict)
+async def get_dashboard_analysis(
+    start_date: str = Query(..., description="Start date for analysis period (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date for analysis period (YYYY-MM-DD)"),
+    crime_type: Optional[str] = None,
+    district: Optional[str] = None,
+    resolution: str = Query("medium", description="Heatmap resolution (high, medium, low)"),
+    interval: str = Query("weekly", description="Trend interval (daily, weekly, monthly)"),
+    time_factor: str = Query("hour_of_day", description="Time factor to analyze (hour_of_day, day_of_week, month_of_year)"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Get heatmap, trend and time pattern analysis for one period in a single request"""
+    try:
+        # Validate parameters
+        try:
+            start = datetime.fromisoformat(start_date)
+            end = datetime.fromisoformat(end_date)
+            
+            if start > end:
+                raise ValueError("Start date must be before end date")
+                
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "code": "invalid_parameters",
+                    "message": "Invalid date range specified",
+                    "details": str(e)
+                }
+            )
+        
+        if (
+            resolution not in _RESOLUTIONS
+            or interval not in _TREND_INTERVALS
+            or time_factor not in _TIME_FACTORS
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "code": "invalid_parameters",
+                    "message": "Invalid resolution, interval or time factor specified"
+                }
+            )
+        
+        # One query serves all three analyses
+        query = select(Incident).where(Incident.date >= start, Incident.date <= end)
+        
+        if district:
+            query = query.where(json_contains(Incident.location, {"district": district}))
+        
+        if crime_type:
+            query = query.where(Incident.type == crime_type)
+        
+        incidents = session.exec(query).all()
+        
+        if not incidents:
+            return ResponseModel.success(
+                data={
+                    "timeframe": {"start": start_date, "end": end_date},
+                    "heatmap": None,
+                    "trends": None,
+                    "timePatterns": None,
+                    "totalIncidents": 0
+                }
+            )
+        
+        # The analyses only read the loaded incidents, so their LLM calls can be in flight
+        # together: the request waits on the slowest round-trip instead of the sum
+        heatmap_data, trend_data, time_patterns = await asyncio.gather(
+            run_in_threadpool(
+                AnalyticsService.generate_heatmap_data,
+                incidents=incidents,
+                resolution=resolution,
+                district=district,
+                crime_type=crime_type
+            ),
+            run_in_threadpool(
+                AnalyticsService.generate_trend_analysis,
+                incidents=incidents,
+                start_date=start,
+                end_date=end,
+                interval=interval,
+                district=district,
+                crime_type=crime_type
+            ),
+            run_in_threadpool(
+                AnalyticsService.analyze_time_patterns,
+                incidents=incidents,
+                time_factor=time_factor,
+                crime_type=crime_type,
+                district=district
+            )
+        )
+        
+        return ResponseModel.success(
+            data={
+                "timeframe": {"start": start_date, "end": end_date},
+                "heatmap": heatmap_data,
+                "trends": trend_data,
+                "timePatterns": time_patterns,
+                "totalIncidents": len(incidents)
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "code": "dashboard_error",
+                "message": f"Error generating dashboard analysis: {str(e)}"
+            }
+        )
\ No newline at end of file
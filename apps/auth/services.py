@@ -7,6 +7,7 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from apps.users.models import User
+from apps.users.services import UserService
 from core.config import settings
 from core.utils.email import send_email
 
@@ -64,48 +65,48 @@ class AuthService:
     def register_user(cls, session: Session, email: str, password: str, name: str, role: str) -> User:
         """Register a new user"""
         # Check if email is already registered
-        existing_user = session.exec(select(User).where(User.email == email)).first()
-        if existing_user:
+        if UserService.email_exists(session, email):
             raise ValueError("Email already registered")
         
         # Set default permissions based on role
-        permissions = {}
+        permissions = []
         if role == "admin":
-            permissions = {
-                "view_users": True,
-                "create_users": True,
-                "update_users": True,
-                "delete_users": True,
-                "view_incidents": True,
-                "create_incidents": True,
-                "update_incidents": True,
-                "delete_incidents": True,
-                "view_reports": True,
-                "create_reports": True,
-                "delete_reports": True,
-                "view_system_settings": True,
-                "update_system_settings": True,
-                "manage_resources": True
-            }
+            permissions = [
+                "view_users",
+                "create_users",
+                "update_users",
+                "delete_users",
+                "view_incidents",
+                "create_incidents",
+                "update_incidents",
+                "delete_incidents",
+                "view_reports",
+                "create_reports",
+                "delete_reports",
+                "view_system_settings",
+                "update_system_settings",
+                "manage_resources"
+            ]
         elif role == "analyst":
-            permissions = {
-                "view_incidents": True,
-                "create_incidents": True,
-                "view_reports": True,
-                "create_reports": True
-            }
+            permissions = [
+                "view_incidents",
+                "create_incidents",
+                "view_reports",
+                "create_reports"
+            ]
         elif role == "officer":
-            permissions = {
-                "view_incidents": True,
-                "create_incidents": True,
-                "update_incidents": True
-            }
+            permissions = [
+                "view_incidents",
+                "create_incidents",
+                "update_incidents"
+            ]
         
         # Generate a unique ID
         user_id = uuid4()
         
         # Create new user
         hashed_password = cls.get_password_hash(password)
+        now = datetime.utcnow()
         user = User(
             id=user_id,  # Explicitly set the ID
             email=email,
@@ -113,13 +114,12 @@ class AuthService:
             name=name,
             role=role,
             permissions=permissions,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         
         session.add(user)
         session.commit()
-        session.refresh(user)
         
         return user
     
@@ -2,7 +2,12 @@ from typing import Optional, Dict, List, Any
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel
-from sqlmodel import SQLModel, Field as SQLField, JSON
+from sqlalchemy import Index, String, cast
+from sqlalchemy.orm import foreign
+from sqlmodel import SQLModel, Field as SQLField, JSON, Relationship
+
+from apps.users.models import User
+from core.database import JSONVariant
 
 class Location(BaseModel):
     address: str
@@ -45,12 +50,24 @@ class Flag(BaseModel):
     domestic_violence: Optional[bool] = False
 
 class Incident(SQLModel, table=True):
+    __table_args__ = (
+        # Covers the type / date range / severity filters used by list_incidents
+        Index("ix_incident_type_date_sev", "type", "date", "severity"),
+        # Serves `location @> '{"district": ...}'` lookups
+        Index(
+            "ix_incident_location_gin",
+            "location",
+            postgresql_using="gin",
+            postgresql_ops={"location": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     id: UUID = SQLField(primary_key=True)
     title: str
     description: Optional[str] = None
     type: str
     date: datetime
-    location: Dict[str, Any] = SQLField(sa_type=JSON)
+    location: Dict[str, Any] = SQLField(sa_type=JSONVariant)
     severity: str
     status: str
     reporting_officer: Optional[str] = None
@@ -69,6 +86,16 @@ class Incident(SQLModel, table=True):
     
     created_at: datetime
     updated_at: datetime
+    
+    # reporting_officer stores the user id as text, so join on a cast rather than a FK.
+    # noload by default; callers that need the officer opt in with selectinload
+    reporting_officer_rel: Optional[User] = Relationship(
+        sa_relationship_kwargs={
+            "primaryjoin": lambda: foreign(Incident.reporting_officer) == cast(User.id, String),
+            "viewonly": True,
+            "lazy": "noload",
+        }
+    )
 
 class IncidentCreate(BaseModel):
     title: str
@@ -1,14 +1,17 @@
 from uuid import UUID
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from sqlmodel import Session
 import logging
+import orjson
 
 # Import the actual models and services - removing the comments
 from apps.incidents.models import IncidentCreate, IncidentUpdate
 from apps.incidents.services import IncidentService, SchemaMismatchError
 from apps.users.models import User
-from core.database import get_session
+from core.database import get_session, engine
 from core.utils.common import ResponseModel
 from core.utils.security import get_current_user, check_permissions
 
@@ -46,7 +49,7 @@ async def list_incidents(
         return ResponseModel.success(data=result)
     except SchemaMismatchError as e:
         # Handle schema mismatch error specifically and return a 500 error
-        logger.error(f"Schema mismatch error: {str(e)}")
+        logger.error("Schema mismatch error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -55,7 +58,7 @@ async def list_incidents(
             }
         )
     except ValueError as e:
-        logger.error(f"Error listing incidents: {str(e)}")
+        logger.error("Error listing incidents: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -64,7 +67,7 @@ async def list_incidents(
             }
         )
     except Exception as e:
-        logger.error(f"Unexpected error in list_incidents: {str(e)}")
+        logger.error("Unexpected error in list_incidents: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -73,6 +76,49 @@ async def list_incidents(
             }
         )
 
+@router.get("/stream")
+async def stream_incidents(
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    type: Optional[str] = None,
+    district: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    severity: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream a page of incidents as newline-delimited JSON"""
+    # Validate dates up front; once streaming starts the 200 status has already been sent
+    for name, value in (("start_date", start_date), ("end_date", end_date)):
+        if value:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "code": "invalid_parameter",
+                        "message": f"Invalid {name}: expected an ISO 8601 date"
+                    }
+                )
+    
+    def generate():
+        # The request-scoped session is closed before the body is sent, so the stream owns one
+        with Session(engine) as session:
+            for incident in IncidentService.stream_incidents(
+                session=session,
+                page=page,
+                limit=limit,
+                type=type,
+                district=district,
+                start_date=start_date,
+                end_date=end_date,
+                severity=severity
+            ):
+                yield orjson.dumps(incident, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @router.get("/{incident_id}", response_model=dict)
 async def get_incident(
     incident_id: UUID,
@@ -94,7 +140,7 @@ async def get_incident(
         
         return ResponseModel.success(data={"incident": incident})
     except ValueError as e:
-        logger.error(f"Database error getting incident {incident_id}: {str(e)}")
+        logger.error("Database error getting incident %s: %s", incident_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -103,7 +149,7 @@ async def get_incident(
             }
         )
     except Exception as e:
-        logger.error(f"Unexpected error in get_incident: {str(e)}")
+        logger.error("Unexpected error in get_incident: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -128,7 +174,7 @@ async def create_incident(
         return ResponseModel.success(data={"incident": incident})
     except ValueError as e:
         if str(e).startswith("Database error:"):
-            logger.error(f"Database error creating incident: {str(e)}")
+            logger.error("Database error creating incident: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail={
@@ -146,7 +192,7 @@ async def create_incident(
                 }
             )
     except Exception as e:
-        logger.error(f"Unexpected error in create_incident: {str(e)}")
+        logger.error("Unexpected error in create_incident: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -184,7 +230,7 @@ async def update_incident(
         
         return ResponseModel.success(data={"incident": updated_incident})
     except ValueError as e:
-        logger.error(f"Database error updating incident {incident_id}: {str(e)}")
+        logger.error("Database error updating incident %s: %s", incident_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -193,7 +239,7 @@ async def update_incident(
             }
         )
     except Exception as e:
-        logger.error(f"Unexpected error in update_incident: {str(e)}")
+        logger.error("Unexpected error in update_incident: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -234,7 +280,7 @@ async def delete_incident(
         
         return ResponseModel.success(message="Incident successfully deleted")
     except ValueError as e:
-        logger.error(f"Database error deleting incident {incident_id}: {str(e)}")
+        logger.error("Database error deleting incident %s: %s", incident_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -243,7 +289,7 @@ async def delete_incident(
             }
         )
     except Exception as e:
-        logger.error(f"Unexpected error in delete_incident: {str(e)}")
+        logger.error("Unexpected error in delete_incident: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
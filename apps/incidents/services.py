@@ -1,20 +1,31 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Iterator
 from datetime import datetime
 import logging
 from uuid import UUID, uuid4
 from sqlmodel import Session, select
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
+from sqlalchemy.orm import selectinload
 
 from apps.incidents.models import Incident, IncidentCreate, IncidentUpdate
+from core.database import json_contains
+from core.utils.cache import ResponseCache
 from core.utils.common import paginate_response, format_datetime
 from core.rag.incidents_vectorstore import (
     add_incident_to_vector_store,
+    add_incidents_to_vector_store,
     update_incident_in_vector_store,
     delete_incident_from_vector_store
 )
 
 logger = logging.getLogger(__name__)
 
+# Formatted list pages, keyed by filter hash and dropped on any incident write
+INCIDENT_LIST_CACHE_PREFIX = "incidents:list"
+incident_list_cache = ResponseCache(maxsize=512, ttl=60)
+
+# Columns an update may not clear by sending an explicit null
+_NON_NULLABLE_FIELDS = frozenset({"title", "type", "date", "location", "severity", "status"})
+
 # Define a custom exception for schema mismatch
 class SchemaMismatchError(Exception):
     """Raised when database schema doesn't match the models"""
@@ -33,29 +44,32 @@ class IncidentService:
         severity: Optional[str] = None
     ) -> Dict[str, Any]:
         """List incidents with optional filtering"""
+        cache_key = ResponseCache.make_key(
+            INCIDENT_LIST_CACHE_PREFIX,
+            type=type,
+            district=district,
+            start_date=start_date,
+            end_date=end_date,
+            severity=severity,
+            page=page,
+            limit=limit
+        )
+        cached = incident_list_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            query = select(Incident)
-            
-            # Apply filters if provided
-            if type:
-                query = query.where(Incident.type == type)
-            if district:
-                query = query.where(Incident.location["district"].as_string() == district)
-            if start_date:
-                start_datetime = datetime.fromisoformat(start_date)
-                query = query.where(Incident.date >= start_datetime)
-            if end_date:
-                end_datetime = datetime.fromisoformat(end_date)
-                query = query.where(Incident.date <= end_datetime)
-            if severity:
-                query = query.where(Incident.severity == severity)
+            query = IncidentService._apply_filters(
+                select(Incident), type, district, start_date, end_date, severity
+            )
             
             # Count total items - use a try/except to handle potential column mapping issues
             try:
                 total = len(session.exec(query).all())
                 
-                # Apply pagination
+                # Apply pagination; officers for the page are loaded in one extra query
                 query = query.offset((page - 1) * limit).limit(limit)
+                query = query.options(selectinload(Incident.reporting_officer_rel))
                 
                 # Execute query
                 incidents = session.exec(query).all()
@@ -63,12 +77,15 @@ class IncidentService:
                 # Convert to dict and format datetime fields
                 incidents_data = [IncidentService._format_incident(incident) for incident in incidents]
                 
-                return paginate_response(
+                result = paginate_response(
                     items=incidents_data,
                     page=page,
                     limit=limit,
                     total=total
                 )
+                incident_list_cache.set(cache_key, result)
+                
+                return result
             except OperationalError as e:
                 # If there's a database schema mismatch, log it and handle it gracefully
                 error_message = f"Database schema mismatch error: {str(e)}"
@@ -77,10 +94,58 @@ class IncidentService:
                 raise SchemaMismatchError("Database schema needs to be updated. Some columns might be missing.")
         except SQLAlchemyError as e:
             # Log the exception for debugging
-            logger.error(f"Database error in list_incidents: {str(e)}")
+            logger.error("Database error in list_incidents: %s", e)
             # Return a structured error response
             raise ValueError(f"Database error: {str(e)}")
     
+    @staticmethod
+    def stream_incidents(
+        session: Session,
+        page: int = 1,
+        limit: int = 20,
+        type: Optional[str] = None,
+        district: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield formatted incidents for one page without building the full list"""
+        query = IncidentService._apply_filters(
+            select(Incident), type, district, start_date, end_date, severity
+        )
+        query = (
+            query.offset((page - 1) * limit)
+            .limit(limit)
+            .options(selectinload(Incident.reporting_officer_rel))
+            .execution_options(yield_per=50)
+        )
+        
+        for incident in session.exec(query):
+            yield IncidentService._format_incident(incident)
+    
+    @staticmethod
+    def _apply_filters(
+        query,
+        type: Optional[str] = None,
+        district: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None
+    ):
+        """Apply the incident list filters to a query"""
+        if type:
+            query = query.where(Incident.type == type)
+        if district:
+            query = query.where(json_contains(Incident.location, {"district": district}))
+        if start_date:
+            query = query.where(Incident.date >= datetime.fromisoformat(start_date))
+        if end_date:
+            query = query.where(Incident.date <= datetime.fromisoformat(end_date))
+        if severity:
+            query = query.where(Incident.severity == severity)
+        
+        return query
+    
     @staticmethod
     def get_incident(session: Session, incident_id: UUID) -> Dict[str, Any]:
         """Get incident by ID"""
@@ -91,7 +156,7 @@ class IncidentService:
             
             return IncidentService._format_incident(incident)
         except SQLAlchemyError as e:
-            logger.error(f"Database error in get_incident: {str(e)}")
+            logger.error("Database error in get_incident: %s", e)
             raise ValueError(f"Database error: {str(e)}")
     
     @staticmethod
@@ -115,51 +180,82 @@ class IncidentService:
                 description=incident_data.description,
                 type=incident_data.type,
                 date=date,
-                location=incident_data.location.dict(),
+                location=incident_data.location.model_dump(mode="json"),
                 severity=incident_data.severity,
                 status=incident_data.status,
                 reporting_officer=user_id,
                 notes=incident_data.notes,
-                flags=incident_data.flags.dict() if incident_data.flags else None,
+                flags=incident_data.flags.model_dump(mode="json") if incident_data.flags else None,
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
             )
             
-            # Add additional fields if they exist in the database schema
-            try:
-                if incident_data.environmental_factors:
-                    incident.environmental_factors = incident_data.environmental_factors.dict()
-                if incident_data.socioeconomic_factors:
-                    incident.socioeconomic_factors = incident_data.socioeconomic_factors.dict()
-                if incident_data.weapon_used:
-                    incident.weapon_used = incident_data.weapon_used
-                if incident_data.victim_count is not None:
-                    incident.victim_count = incident_data.victim_count
-                if incident_data.suspect_count is not None:
-                    incident.suspect_count = incident_data.suspect_count
-                if incident_data.estimated_loss_value is not None:
-                    incident.estimated_loss_value = incident_data.estimated_loss_value
-            except AttributeError:
-                # Log but continue if some attributes aren't found
-                logger.warning("Some attributes couldn't be set - schema may be outdated")
+            # Add optional analysis fields
+            if incident_data.environmental_factors:
+                incident.environmental_factors = incident_data.environmental_factors.model_dump(mode="json")
+            if incident_data.socioeconomic_factors:
+                incident.socioeconomic_factors = incident_data.socioeconomic_factors.model_dump(mode="json")
+            if incident_data.weapon_used:
+                incident.weapon_used = incident_data.weapon_used
+            if incident_data.victim_count is not None:
+                incident.victim_count = incident_data.victim_count
+            if incident_data.suspect_count is not None:
+                incident.suspect_count = incident_data.suspect_count
+            if incident_data.estimated_loss_value is not None:
+                incident.estimated_loss_value = incident_data.estimated_loss_value
             
             # Save to database
             session.add(incident)
             session.commit()
             session.refresh(incident)
+            incident_list_cache.invalidate(INCIDENT_LIST_CACHE_PREFIX)
             
             # Add to vector store for RAG
             try:
                 add_incident_to_vector_store(incident)
             except Exception as e:
-                logger.error(f"Vector store update failed, but incident was created: {e}")
+                logger.error("Vector store update failed, but incident was created: %s", e)
             
             return IncidentService._format_incident(incident)
         except SQLAlchemyError as e:
             session.rollback()
-            logger.error(f"Database error in create_incident: {str(e)}")
+            logger.error("Database error in create_incident: %s", e)
             raise ValueError(f"Database error: {str(e)}")
     
+    @staticmethod
+    def bulk_create(
+        session: Session,
+        rows: List[Dict[str, Any]],
+        sync_vector_store: bool = True
+    ) -> int:
+        """Insert many incidents with a single executemany INSERT"""
+        if not rows:
+            return 0
+        
+        now = datetime.utcnow()
+        mappings = [
+            {"id": uuid4(), "status": "open", "created_at": now, "updated_at": now, **row}
+            for row in rows
+        ]
+        
+        try:
+            session.bulk_insert_mappings(Incident, mappings)
+            session.commit()
+            incident_list_cache.invalidate(INCIDENT_LIST_CACHE_PREFIX)
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error("Database error in bulk_create: %s", e)
+            raise ValueError(f"Database error: {str(e)}")
+        
+        # One embedding batch for the whole import instead of a call per incident
+        if sync_vector_store:
+            try:
+                add_incidents_to_vector_store([Incident(**mapping) for mapping in mappings])
+            except Exception as e:
+                logger.error("Vector store update failed, but incidents were created: %s", e)
+        
+        return len(mappings)
+    
     @staticmethod
     def update_incident(
         session: Session,
@@ -173,68 +269,32 @@ class IncidentService:
             if not incident:
                 return None
             
-            # Update fields if provided
-            if incident_data.title:
-                incident.title = incident_data.title
-            if incident_data.description is not None:
-                incident.description = incident_data.description
-            if incident_data.type:
-                incident.type = incident_data.type
-            if incident_data.date:
-                incident.date = datetime.fromisoformat(incident_data.date)
-            if incident_data.location:
-                incident.location = incident_data.location.dict()
-            if incident_data.severity:
-                incident.severity = incident_data.severity
-            if incident_data.status:
-                incident.status = incident_data.status
-            if incident_data.reporting_officer:
-                incident.reporting_officer = incident_data.reporting_officer
-            if incident_data.notes is not None:
-                incident.notes = incident_data.notes
-            if incident_data.flags:
-                incident.flags = incident_data.flags.dict()
-            
-            # Try to update additional fields if they exist in the schema
-            try:
-                if incident_data.environmental_factors:
-                    incident.environmental_factors = incident_data.environmental_factors.dict()
-                if incident_data.socioeconomic_factors:
-                    incident.socioeconomic_factors = incident_data.socioeconomic_factors.dict()
-                if incident_data.weapon_used is not None:
-                    incident.weapon_used = incident_data.weapon_used
-                if incident_data.victim_count is not None:
-                    incident.victim_count = incident_data.victim_count
-                if incident_data.suspect_count is not None:
-                    incident.suspect_count = incident_data.suspect_count
-                if incident_data.estimated_loss_value is not None:
-                    incident.estimated_loss_value = incident_data.estimated_loss_value
-                if incident_data.response_time_minutes is not None:
-                    incident.response_time_minutes = incident_data.response_time_minutes
-                if incident_data.risk_score is not None:
-                    incident.risk_score = incident_data.risk_score
-            except AttributeError:
-                # Log but continue if some attributes aren't found
-                logger.warning("Some attributes couldn't be updated - schema may be outdated")
+            # Apply only the fields the client actually sent; nested models are already
+            # dumped to plain dicts, so only the date string needs converting
+            for field, value in incident_data.model_dump(mode="json", exclude_unset=True).items():
+                if value is None and field in _NON_NULLABLE_FIELDS:
+                    continue
+                if field == "date":
+                    value = datetime.fromisoformat(value)
+                setattr(incident, field, value)
             
             # Update timestamp
             incident.updated_at = datetime.utcnow()
             
-            # Save to database
-            session.add(incident)
+            # Instance is already tracked by the session; commit flushes the UPDATE without a re-SELECT
             session.commit()
-            session.refresh(incident)
+            incident_list_cache.invalidate(INCIDENT_LIST_CACHE_PREFIX)
             
             # Update in vector store
             try:
                 update_incident_in_vector_store(incident)
             except Exception as e:
-                logger.error(f"Vector store update failed, but incident was updated: {e}")
+                logger.error("Vector store update failed, but incident was updated: %s", e)
             
             return IncidentService._format_incident(incident)
         except SQLAlchemyError as e:
             session.rollback()
-            logger.error(f"Database error in update_incident: {str(e)}")
+            logger.error("Database error in update_incident: %s", e)
             raise ValueError(f"Database error: {str(e)}")
     
     @staticmethod
@@ -247,17 +307,18 @@ class IncidentService:
             
             session.delete(incident)
             session.commit()
+            incident_list_cache.invalidate(INCIDENT_LIST_CACHE_PREFIX)
             
             # Delete from vector store
             try:
                 delete_incident_from_vector_store(incident_id)
             except Exception as e:
-                logger.error(f"Vector store deletion failed, but incident was deleted: {e}")
+                logger.error("Vector store deletion failed, but incident was deleted: %s", e)
             
             return True
         except SQLAlchemyError as e:
             session.rollback()
-            logger.error(f"Database error in delete_incident: {str(e)}")
+            logger.error("Database error in delete_incident: %s", e)
             raise ValueError(f"Database error: {str(e)}")
     
     @staticmethod
@@ -279,28 +340,29 @@ class IncidentService:
             "updated_at": format_datetime(incident.updated_at)
         }
         
-        # Include additional fields safely if they exist
-        try:
-            if hasattr(incident, "environmental_factors") and incident.environmental_factors:
-                incident_data["environmental_factors"] = incident.environmental_factors
-            if hasattr(incident, "socioeconomic_factors") and incident.socioeconomic_factors:
-                incident_data["socioeconomic_factors"] = incident.socioeconomic_factors
-            if hasattr(incident, "weapon_used") and incident.weapon_used:
-                incident_data["weapon_used"] = incident.weapon_used
-            if hasattr(incident, "victim_count") and incident.victim_count is not None:
-                incident_data["victim_count"] = incident.victim_count
-            if hasattr(incident, "suspect_count") and incident.suspect_count is not None:
-                incident_data["suspect_count"] = incident.suspect_count
-            if hasattr(incident, "estimated_loss_value") and incident.estimated_loss_value is not None:
-                incident_data["estimated_loss_value"] = incident.estimated_loss_value
-            if hasattr(incident, "response_time_minutes") and incident.response_time_minutes is not None:
-                incident_data["response_time_minutes"] = incident.response_time_minutes
-            if hasattr(incident, "related_incidents") and incident.related_incidents:
-                incident_data["related_incidents"] = incident.related_incidents
-            if hasattr(incident, "risk_score") and incident.risk_score is not None:
-                incident_data["risk_score"] = incident.risk_score
-        except (AttributeError, TypeError) as e:
-            # Just log and continue if fields aren't accessible
-            logger.warning(f"Error accessing attribute in _format_incident: {str(e)}")
+        # Officer is only present when the caller eager-loaded it (noload otherwise)
+        officer = incident.reporting_officer_rel
+        if officer is not None:
+            incident_data["reporting_officer_name"] = officer.name
+        
+        # Include optional analysis fields when set
+        if incident.environmental_factors:
+            incident_data["environmental_factors"] = incident.environmental_factors
+        if incident.socioeconomic_factors:
+            incident_data["socioeconomic_factors"] = incident.socioeconomic_factors
+        if incident.weapon_used:
+            incident_data["weapon_used"] = incident.weapon_used
+        if incident.victim_count is not None:
+            incident_data["victim_count"] = incident.victim_count
+        if incident.suspect_count is not None:
+            incident_data["suspect_count"] = incident.suspect_count
+        if incident.estimated_loss_value is not None:
+            incident_data["estimated_loss_value"] = incident.estimated_loss_value
+        if incident.response_time_minutes is not None:
+            incident_data["response_time_minutes"] = incident.response_time_minutes
+        if incident.related_incidents:
+            incident_data["related_incidents"] = incident.related_incidents
+        if incident.risk_score is not None:
+            incident_data["risk_score"] = incident.risk_score
         
         return incident_data
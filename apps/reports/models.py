@@ -1,9 +1,19 @@
 from typing import Optional, Dict, List, Any
 from datetime import datetime
+from enum import IntEnum
 from uuid import UUID
 from pydantic import BaseModel
+from sqlalchemy import Index, SmallInteger
 from sqlmodel import SQLModel, Field, JSON
 
+class ReportStatus(IntEnum):
+    """Report lifecycle states, stored as a small integer"""
+    PENDING = 0
+    DRAFT = 1
+    PROCESSING = 2
+    COMPLETED = 3
+    FAILED = 4
+
 class DateRange(BaseModel):
     start: str
     end: str
@@ -15,15 +25,23 @@ class ReportParameters(BaseModel):
     compare_with_previous: Optional[bool] = False
 
 class Report(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination on (created_at DESC, id DESC); btree scans it backwards
+        Index("ix_report_created_at_id", "created_at", "id"),
+    )
+    
     id: UUID = Field(primary_key=True)
     title: str
     description: Optional[str] = None
     type: str
     district: str
     date_range: Dict[str, Any] = Field(sa_type=JSON)  # Use JSON type for dict
+    # Typed copies of date_range start/end so range filters can use a btree index
+    date_range_start: Optional[datetime] = Field(default=None, index=True)
+    date_range_end: Optional[datetime] = Field(default=None, index=True)
     content: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)  # Use JSON type for dict
     parameters: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)  # Use JSON type for dict
-    status: str
+    status: ReportStatus = Field(sa_type=SmallInteger)
     created_by: str
     estimated_completion: Optional[datetime] = None
     created_at: datetime
@@ -1,9 +1,9 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from typing import Optional
 from sqlmodel import Session
 
-from apps.reports.models import ReportCreate, ReportUpdate
+from apps.reports.models import Report, ReportCreate, ReportUpdate
 from apps.reports.services import ReportService
 from apps.users.models import User
 from core.database import get_session
@@ -12,7 +12,22 @@ from core.utils.security import get_current_user, check_permissions
 
 router = APIRouter()
 
-@router.get("/", response_model=dict)
+def _get_report_or_404(session: Session, report_id: UUID) -> Report:
+    """Load a report instance or raise 404"""
+    report = ReportService.get_report_obj(session=session, report_id=report_id)
+    
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "not_found",
+                "message": f"Report with ID {report_id} not found"
+            }
+        )
+    
+    return report
+
+@router.get("/")
 async def list_reports(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
@@ -20,23 +35,34 @@ async def list_reports(
     district: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """List reports with optional filtering"""
-    reports = ReportService.list_reports(
-        session=session,
-        page=page,
-        limit=limit,
-        type=type,
-        district=district,
-        start_date=start_date,
-        end_date=end_date
-    )
+    try:
+        reports = ReportService.list_reports(
+            session=session,
+            page=page,
+            limit=limit,
+            type=type,
+            district=district,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "invalid_parameter",
+                "message": str(e)
+            }
+        )
     
     return ResponseModel.success(data=reports)
 
-@router.get("/{report_id}", response_model=dict)
+@router.get("/{report_id}")
 async def get_report(
     report_id: UUID,
     session: Session = Depends(get_session),
@@ -69,6 +95,7 @@ async def create_report(
             report_data=report_data,
             user_id=current_user.id
         )
+        
         return ResponseModel.success(data={"report": report})
     except ValueError as e:
         raise HTTPException(
@@ -88,26 +115,56 @@ async def update_report(
     current_user: User = Depends(get_current_user)
 ):
     """Update a report"""
-    report = ReportService.get_report(session=session, report_id=report_id)
+    report = _get_report_or_404(session, report_id)
     
-    if not report:
+    try:
+        updated_report = ReportService.update_report(
+            session=session,
+            report=report,
+            report_data=report_data,
+            user_id=current_user.id
+        )
+    except ValueError as e:
+        # The report's status no longer allows edits
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=status.HTTP_409_CONFLICT,
             detail={
-                "code": "not_found",
-                "message": f"Report with ID {report_id} not found"
+                "code": "invalid_state",
+                "message": str(e)
             }
         )
     
-    updated_report = ReportService.update_report(
-        session=session,
-        report_id=report_id,
-        report_data=report_data,
-        user_id=current_user.id
-    )
-    
     return ResponseModel.success(data={"report": updated_report})
 
+@router.post("/{report_id}/generate", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def generate_report(
+    report_id: UUID,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+    _: User = Depends(check_permissions(["create_reports"]))
+):
+    """Queue content generation for a report"""
+    report = _get_report_or_404(session, report_id)
+    
+    try:
+        queued_report = ReportService.prepare_generation(report)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "code": "invalid_state",
+                "message": str(e)
+            }
+        )
+    
+    # Generation runs after the response is sent; clients poll the report for its status
+    background_tasks.add_task(ReportService.generate_report_content_task, report.id)
+    
+    return ResponseModel.success(
+        data={"report": queued_report},
+        message="Report generation queued"
+    )
+
 @router.delete("/{report_id}", response_model=dict)
 async def delete_report(
     report_id: UUID,
@@ -115,22 +172,22 @@ async def delete_report(
     _: User = Depends(check_permissions(["delete_reports"]))
 ):
     """Delete a report"""
-    report = ReportService.get_report(session=session, report_id=report_id)
+    report = _get_report_or_404(session, report_id)
     
-    if not report:
+    try:
+        ReportService.delete_report(session=session, report=report)
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=status.HTTP_409_CONFLICT,
             detail={
-                "code": "not_found",
-                "message": f"Report with ID {report_id} not found"
+                "code": "invalid_state",
+                "message": str(e)
             }
         )
     
-    ReportService.delete_report(session=session, report_id=report_id)
-    
     return ResponseModel.success(message="Report successfully deleted")
 
-@router.get("/{report_id}/export", response_model=dict)
+@router.get("/{report_id}/export")
 async def export_report(
     report_id: UUID,
     format: str = Query("pdf", description="Export format (pdf, csv, json)"),
@@ -138,16 +195,7 @@ async def export_report(
     current_user: User = Depends(get_current_user)
 ):
     """Export a report in the specified format"""
-    report = ReportService.get_report(session=session, report_id=report_id)
-    
-    if not report:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "code": "not_found",
-                "message": f"Report with ID {report_id} not found"
-            }
-        )
+    _get_report_or_404(session, report_id)
     
     if format not in ["pdf", "csv", "json"]:
         raise HTTPException(
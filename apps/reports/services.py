@@ -1,10 +1,31 @@
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
+from functools import lru_cache
+import logging
 from uuid import UUID, uuid4
+from sqlalchemy import func, tuple_, update
 from sqlmodel import Session, select
 
-from apps.reports.models import Report, ReportCreate, ReportUpdate
-from core.utils.common import paginate_response, format_datetime
+from apps.reports.models import Report, ReportCreate, ReportStatus, ReportUpdate
+from core.database import engine, enable_local_jit
+from core.utils.cache import ResponseCache
+from core.utils.common import paginate_response, encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Report states that still accept edits / that block deletion / that may be (re)generated
+_UPDATABLE_STATUSES = frozenset({ReportStatus.PENDING, ReportStatus.DRAFT})
+_UNDELETABLE_STATUSES = frozenset({ReportStatus.PROCESSING})
+_GENERATABLE_STATUSES = frozenset({ReportStatus.PENDING, ReportStatus.DRAFT, ReportStatus.FAILED})
+
+@lru_cache(maxsize=256)
+def _parse_iso_datetime(value: str) -> datetime:
+    """Parse an ISO-8601 filter bound; dashboards replay the same strings across pages"""
+    return datetime.fromisoformat(value)
+
+# Filtered report counts, keyed on day-rounded bounds and dropped on create/delete
+REPORT_COUNT_CACHE_PREFIX = "reports:count"
+report_count_cache = ResponseCache(maxsize=256, ttl=30)
 
 class ReportService:
     @staticmethod
@@ -15,68 +36,130 @@ class ReportService:
         type: Optional[str] = None,
         district: Optional[str] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """List reports with optional filtering"""
-        query = select(Report)
+        """List reports with optional filtering, newest first
+
+        Pass the previous response's next_cursor to page with a keyset seek
+        instead of OFFSET.
+        """
+        filters = []
         
         # Apply filters if provided
         if type:
-            query = query.where(Report.type == type)
+            filters.append(Report.type == type)
         if district:
-            query = query.where(Report.district == district)
-        if start_date or end_date:
+            filters.append(Report.district == district)
+        # Round bounds out to whole days so nearby requests share plans and cached counts
+        start = end = None
+        if start_date:
+            start = _parse_iso_datetime(start_date).replace(hour=0, minute=0, second=0, microsecond=0)
+        if end_date:
+            end = (_parse_iso_datetime(end_date) + timedelta(days=1)).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+        
+        if start or end:
             # Filter by date range (check if report date range overlaps with requested range)
-            if start_date:
-                start = datetime.fromisoformat(start_date)
-                # Reports with end date >= requested start date
-                query = query.where(Report.date_range["end"].as_string() >= start_date)
-            if end_date:
-                end = datetime.fromisoformat(end_date)
-                # Reports with start date <= requested end date
-                query = query.where(Report.date_range["start"].as_string() <= end_date)
+            if start:
+                # Reports with end date >= requested start day
+                filters.append(Report.date_range_end >= start)
+            if end:
+                # Reports with start date before the day after the requested end day
+                filters.append(Report.date_range_start < end)
         
-        # Count total items
-        total = len(session.exec(query).all())
+        # Project only the listed columns so the content/parameters JSON blobs stay in the DB
+        query = select(
+            Report.id,
+            Report.title,
+            Report.type,
+            Report.district,
+            Report.date_range,
+            Report.status,
+            Report.created_by,
+            Report.created_at
+        )
+        count_query = select(func.count()).select_from(Report)
+        for condition in filters:
+            query = query.where(condition)
+            count_query = count_query.where(condition)
         
-        # Apply pagination
-        query = query.offset((page - 1) * limit).limit(limit)
+        # Count total items in the database instead of loading every row
+        count_key = ResponseCache.make_key(
+            REPORT_COUNT_CACHE_PREFIX, type=type, district=district, start=start, end=end
+        )
+        total = report_count_cache.get(count_key)
+        if total is None:
+            total = session.exec(count_query).one()
+            report_count_cache.set(count_key, total)
         
-        # Execute query
-        reports = session.exec(query).all()
+        # Apply pagination; fetch one extra row to know whether another page exists
+        query = query.order_by(Report.created_at.desc(), Report.id.desc())
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(tuple_(Report.created_at, Report.id) < (cursor_created_at, cursor_id))
+        else:
+            query = query.offset((page - 1) * limit)
         
-        # Format reports for response
+        # Execute query, formatting rows as they stream in rather than materializing the page
+        query = query.limit(limit + 1).execution_options(yield_per=50)
         reports_data = []
-        for report in reports:
-            report_dict = {
-                "id": report.id,
-                "title": report.title,
-                "type": report.type,
-                "district": report.district,
-                "dateRange": {
-                    "start": report.date_range.get("start"),
-                    "end": report.date_range.get("end")
-                },
-                "status": report.status,
-                "createdBy": report.created_by,
-                "createdAt": format_datetime(report.created_at)
-            }
-            reports_data.append(report_dict)
+        next_cursor = None
+        last_report = None
+        result = session.exec(query)
+        try:
+            for report in result:
+                if len(reports_data) == limit:
+                    # The extra row only signals that another page exists
+                    next_cursor = encode_cursor(last_report.created_at, last_report.id)
+                    break
+                
+                reports_data.append({
+                    "id": report.id,
+                    "title": report.title,
+                    "type": report.type,
+                    "district": report.district,
+                    "dateRange": {
+                        "start": report.date_range.get("start"),
+                        "end": report.date_range.get("end")
+                    },
+                    "status": ReportStatus(report.status).name.lower(),
+                    "createdBy": report.created_by,
+                    "createdAt": report.created_at
+                })
+                last_report = report
+        finally:
+            # Release the server-side cursor even when we stop on the extra row
+            result.close()
         
-        return paginate_response(
+        response = paginate_response(
             items=reports_data,
             page=page,
             limit=limit,
             total=total
         )
+        response["pagination"]["next_cursor"] = next_cursor
+        
+        return response
+    
+    @staticmethod
+    def get_report_obj(session: Session, report_id: UUID) -> Optional[Report]:
+        """Get the report ORM instance by ID"""
+        return session.get(Report, report_id)
     
     @staticmethod
     def get_report(session: Session, report_id: UUID) -> Dict[str, Any]:
         """Get report by ID"""
-        report = session.get(Report, report_id)
+        report = ReportService.get_report_obj(session, report_id)
         if not report:
             return None
         
+        return ReportService._serialize_report(report)
+    
+    @staticmethod
+    def _serialize_report(report: Report) -> Dict[str, Any]:
+        """Format a report instance for API response (datetimes are encoded by the response class)"""
         return {
             "id": report.id,
             "title": report.title,
@@ -86,11 +169,11 @@ class ReportService:
             "dateRange": report.date_range,
             "content": report.content,
             "parameters": report.parameters,
-            "status": report.status,
+            "status": ReportStatus(report.status).name.lower(),
             "createdBy": report.created_by,
-            "estimatedCompletion": format_datetime(report.estimated_completion) if report.estimated_completion else None,
-            "createdAt": format_datetime(report.created_at),
-            "updatedAt": format_datetime(report.updated_at)
+            "estimatedCompletion": report.estimated_completion,
+            "createdAt": report.created_at,
+            "updatedAt": report.updated_at
         }
     
     @staticmethod
@@ -104,7 +187,8 @@ class ReportService:
         report_id = uuid4()
         
         # Calculate estimated completion time (5 minutes per report as an example)
-        estimated_completion = datetime.utcnow() + timedelta(minutes=5)
+        now = datetime.utcnow()
+        estimated_completion = now + timedelta(minutes=5)
         
         # Create report
         report = Report(
@@ -117,85 +201,107 @@ class ReportService:
                 "start": report_data.date_range.start,
                 "end": report_data.date_range.end
             },
-            parameters=report_data.parameters.dict() if report_data.parameters else None,
+            date_range_start=datetime.fromisoformat(report_data.date_range.start),
+            date_range_end=datetime.fromisoformat(report_data.date_range.end),
+            parameters=report_data.parameters.model_dump(exclude_unset=True) if report_data.parameters else None,
             content={},  # Empty content initially
-            status="pending",
+            status=ReportStatus.PENDING,
             created_by=user_id,
             estimated_completion=estimated_completion,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         
         # Save to database
         session.add(report)
         session.commit()
-        session.refresh(report)
+        report_count_cache.invalidate(REPORT_COUNT_CACHE_PREFIX)
         
-        return ReportService.get_report(session, report_id)
+        # Serialize the in-memory instance; no refresh/re-select needed
+        return ReportService._serialize_report(report)
     
     @staticmethod
     def update_report(
         session: Session,
-        report_id: UUID,
+        report: Report,
         report_data: ReportUpdate,
         user_id: UUID
     ) -> Dict[str, Any]:
-        """Update a report"""
-        report = session.get(Report, report_id)
+        """Update a report already loaded by the caller"""
+        # Collect only values that actually differ from what is stored
+        changes = {}
+        if report_data.title and report_data.title != report.title:
+            changes["title"] = report_data.title
+        if report_data.description is not None and report_data.description != report.description:
+            changes["description"] = report_data.description
+        if report_data.parameters is not None:
+            # Merge parameters rather than replace; reassigning marks the JSON column dirty
+            parameters = {**(report.parameters or {}), **report_data.parameters}
+            if parameters != report.parameters:
+                changes["parameters"] = parameters
+        
+        # Nothing to change: skip the state check and the UPDATE entirely
+        if not changes:
+            return ReportService._serialize_report(report)
         
         # Check if report is in a state that allows updates
-        if report.status not in ["pending", "draft"]:
+        if report.status not in _UPDATABLE_STATUSES:
             raise ValueError("Cannot update a report that is already being processed or completed")
         
-        # Update fields if provided
-        if report_data.title:
-            report.title = report_data.title
-        if report_data.description is not None:
-            report.description = report_data.description
-        if report_data.parameters:
-            # Merge parameters rather than replace
-            if report.parameters:
-                report.parameters.update(report_data.parameters)
-            else:
-                report.parameters = report_data.parameters
+        for field, value in changes.items():
+            setattr(report, field, value)
         
         # Update timestamp
         report.updated_at = datetime.utcnow()
         
-        # Save to database
-        session.add(report)
+        # Report is already tracked by the session
         session.commit()
-        session.refresh(report)
         
-        return ReportService.get_report(session, report_id)
+        # Serialize the in-memory instance; no refresh/re-select needed
+        return ReportService._serialize_report(report)
     
     @staticmethod
-    def delete_report(session: Session, report_id: UUID) -> bool:
-        """Delete a report"""
-        report = session.get(Report, report_id)
-        if not report:
-            return False
+    def delete_report(session: Session, report: Report) -> bool:
+        """Delete a report already loaded by the caller"""
         
         # Check if report can be deleted
-        if report.status in ["processing"]:
+        if report.status in _UNDELETABLE_STATUSES:
             raise ValueError("Cannot delete a report that is currently being processed")
         
         session.delete(report)
         session.commit()
+        report_count_cache.invalidate(REPORT_COUNT_CACHE_PREFIX)
         
         return True
     
+    @staticmethod
+    def prepare_generation(report: Report) -> Dict[str, Any]:
+        """Check that a report already loaded by the caller may be generated, and serialize it"""
+        if report.status == ReportStatus.PROCESSING:
+            raise ValueError("Report is already being generated")
+        if report.status not in _GENERATABLE_STATUSES:
+            raise ValueError("Cannot regenerate a completed report")
+        
+        return ReportService._serialize_report(report)
+    
     @staticmethod
     def generate_report_content(session: Session, report_id: UUID) -> Dict[str, Any]:
         """Generate content for a report - this would typically be triggered by a background task"""
-        report = session.get(Report, report_id)
-        if not report:
+        # Claim the report with a single conditional UPDATE so pollers see "processing";
+        # a concurrent run or a completed report matches no row and stops here
+        claimed = session.exec(
+            update(Report)
+            .where(Report.id == report_id, Report.status.in_(_GENERATABLE_STATUSES))
+            .values(status=ReportStatus.PROCESSING, updated_at=datetime.utcnow())
+        )
+        session.commit()
+        if claimed.rowcount == 0:
             return None
         
-        # Update status
-        report.status = "processing"
-        session.add(report)
-        session.commit()
+        report = session.get(Report, report_id)
+        
+        # Generation runs large aggregates; JIT pays off there but not on short queries
+        enable_local_jit(session)
         
         try:
             # In a real application, this would involve querying data, generating charts, etc.
@@ -250,19 +356,30 @@ class ReportService:
                 ]
             }
             
-            # Update report with content
-            report.content = content
-            report.status = "completed"
+            status = ReportStatus.COMPLETED
             
         except Exception as e:
             # If generation fails, mark as failed
-            report.status = "failed"
-            report.content = {"error": str(e)}
+            status = ReportStatus.FAILED
+            content = {"error": str(e)}
             
-        # Update report
-        report.updated_at = datetime.utcnow()
-        session.add(report)
+        # Write the result with one targeted UPDATE; the loaded instance is synchronized in place
+        session.exec(
+            update(Report)
+            .where(Report.id == report_id)
+            .values(status=status, content=content, updated_at=datetime.utcnow())
+        )
         session.commit()
-        session.refresh(report)
         
-        return ReportService.get_report(session, report_id)
+        # Serialize the in-memory instance; no refresh/re-select needed
+        return ReportService._serialize_report(report)
+    
+    @staticmethod
+    def generate_report_content_task(report_id: UUID) -> None:
+        """Background task entry point; runs generation in its own session"""
+        with Session(engine, expire_on_commit=False) as session:
+            try:
+                ReportService.generate_report_content(session, report_id)
+            except Exception as e:
+                session.rollback()
+                logger.error("Report generation failed for %s: %s", report_id, e)
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+
+# Fixed-shape mock structures; field names match the JSON keys they serialize to
+
+@dataclass(slots=True, frozen=True)
+class ResourceCount:
+    officers: int
+    vehicles: int
+
+@dataclass(slots=True, frozen=True)
+class DistrictAllocation:
+    district: str
+    risk: str
+    resources: ResourceCount
+    coverage: int
+    responseTime: float
+
+@dataclass(slots=True, frozen=True)
+class Shift:
+    name: str
+    timeRange: str
+    officers: int
+    vehicles: int
+    priorityAreas: Tuple[str, ...]
+    supervisor: str
+
+@dataclass(slots=True, frozen=True)
+class DistrictSchedule:
+    district: str
+    shifts: Tuple[Shift, ...]
+
+class OptimizationConstraints(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, extra="allow")
+    
+    min_coverage: Optional[float] = Field(default=None, alias="minCoverage", ge=0, le=100)
+
+class OptimizationRequest(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    constraints: Optional[OptimizationConstraints] = None
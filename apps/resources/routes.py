@@ -1,93 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from typing import Optional
 from sqlmodel import Session
+import numpy as np
+import orjson
 
+from apps.resources.models import (
+    DistrictAllocation,
+    DistrictSchedule,
+    OptimizationRequest,
+    ResourceCount,
+    Shift
+)
 from apps.users.models import User
 from core.database import get_session
-from core.utils.common import ResponseModel
+from core.optimization import RISK_WEIGHTS, optimize_allocation, project_impact
+from core.utils.common import ResponseModel, make_etag, etag_json_response
 from core.utils.security import get_current_user, check_permissions
 
 router = APIRouter()
 
-@router.get("/allocation", response_model=dict)
+# Mock payloads, built once at import instead of on every request
+_ALLOCATION_MOCK = {
+    "totalResources": ResourceCount(officers=124, vehicles=42),
+    "allocation": (
+        DistrictAllocation("downtown", "high", ResourceCount(45, 18), 85, 7.2),
+        DistrictAllocation("westside", "medium", ResourceCount(25, 10), 72, 8.5),
+        DistrictAllocation("eastside", "medium", ResourceCount(20, 8), 68, 9.1),
+        DistrictAllocation("northside", "low", ResourceCount(18, 7), 65, 9.8),
+        DistrictAllocation("southside", "low", ResourceCount(16, 6), 60, 10.5),
+    )
+}
+
+_SCHEDULES_MOCK = (
+    DistrictSchedule("downtown", (
+        Shift("Morning", "06:00-14:00", 12, 5, ("Transit Hubs", "Commercial District"), "Officer Johnson"),
+        Shift("Afternoon", "14:00-22:00", 18, 8, ("Commercial District", "Entertainment Zone"), "Officer Williams"),
+        Shift("Night", "22:00-06:00", 15, 7, ("Entertainment Zone", "Transit Hubs"), "Officer Davis"),
+    )),
+    DistrictSchedule("westside", (
+        Shift("Morning", "06:00-14:00", 8, 3, ("Residential Areas", "Schools"), "Officer Miller"),
+        Shift("Afternoon", "14:00-22:00", 10, 4, ("Shopping Centers", "Parks"), "Officer Brown"),
+        Shift("Night", "22:00-06:00", 7, 3, ("Residential Areas", "Commercial Areas"), "Officer Wilson"),
+    )),
+)
+
+_OPTIMIZE_MOCK = {
+    "optimizationId": "opt_123456",
+    "status": "completed",
+    "currentAllocation": {
+        "downtown": {
+            "officers": 45,
+            "vehicles": 18
+        },
+        "westside": {
+            "officers": 25,
+            "vehicles": 10
+        },
+        "eastside": {
+            "officers": 20,
+            "vehicles": 8
+        },
+        "northside": {
+            "officers": 18,
+            "vehicles": 7
+        },
+        "southside": {
+            "officers": 16,
+            "vehicles": 6
+        }
+    }
+}
+
+# Static GET responses serialized once; served as raw bytes without response-model encoding
+_ALLOCATION_JSON = orjson.dumps(ResponseModel.success(data=_ALLOCATION_MOCK))
+_ALLOCATION_ETAG = make_etag(_ALLOCATION_JSON)
+
+@router.get("/allocation")
 async def get_resource_allocation(
+    request: Request,
     district: Optional[str] = None,
     resource_type: Optional[str] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get current resource allocation data"""
-    try:
-        # In a real application, we'd fetch this from the database
-        # For now, we'll return mock data
-        return ResponseModel.success(
-            data={
-                "totalResources": {
-                    "officers": 124,
-                    "vehicles": 42
-                },
-                "allocation": [
-                    {
-                        "district": "downtown",
-                        "risk": "high",
-                        "resources": {
-                            "officers": 45,
-                            "vehicles": 18
-                        },
-                        "coverage": 85,
-                        "responseTime": 7.2
-                    },
-                    {
-                        "district": "westside",
-                        "risk": "medium",
-                        "resources": {
-                            "officers": 25,
-                            "vehicles": 10
-                        },
-                        "coverage": 72,
-                        "responseTime": 8.5
-                    },
-                    {
-                        "district": "eastside",
-                        "risk": "medium",
-                        "resources": {
-                            "officers": 20,
-                            "vehicles": 8
-                        },
-                        "coverage": 68,
-                        "responseTime": 9.1
-                    },
-                    {
-                        "district": "northside",
-                        "risk": "low",
-                        "resources": {
-                            "officers": 18,
-                            "vehicles": 7
-                        },
-                        "coverage": 65,
-                        "responseTime": 9.8
-                    },
-                    {
-                        "district": "southside",
-                        "risk": "low",
-                        "resources": {
-                            "officers": 16,
-                            "vehicles": 6
-                        },
-                        "coverage": 60,
-                        "responseTime": 10.5
-                    }
-                ]
-            }
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error retrieving resource allocation data: {str(e)}"
-        )
+    # In a real application, we'd fetch this from the database
+    # For now, we'll return mock data
+    return etag_json_response(request, _ALLOCATION_JSON, _ALLOCATION_ETAG)
 
-@router.get("/schedule", response_model=dict)
+@router.get("/schedule")
 async def get_patrol_schedule(
+    request: Request,
     district: Optional[str] = None,
     date: str = Query(None, description="Schedule date (YYYY-MM-DD)"),
     session: Session = Depends(get_session),
@@ -97,71 +100,13 @@ async def get_patrol_schedule(
     try:
         # In a real application, we'd fetch this from the database
         # For now, we'll return mock data
-        return ResponseModel.success(
+        content = orjson.dumps(ResponseModel.success(
             data={
                 "date": date or "2025-03-15",
-                "schedules": [
-                    {
-                        "district": "downtown",
-                        "shifts": [
-                            {
-                                "name": "Morning",
-                                "timeRange": "06:00-14:00",
-                                "officers": 12,
-                                "vehicles": 5,
-                                "priorityAreas": ["Transit Hubs", "Commercial District"],
-                                "supervisor": "Officer Johnson"
-                            },
-                            {
-                                "name": "Afternoon",
-                                "timeRange": "14:00-22:00",
-                                "officers": 18,
-                                "vehicles": 8,
-                                "priorityAreas": ["Commercial District", "Entertainment Zone"],
-                                "supervisor": "Officer Williams"
-                            },
-                            {
-                                "name": "Night",
-                                "timeRange": "22:00-06:00",
-                                "officers": 15,
-                                "vehicles": 7,
-                                "priorityAreas": ["Entertainment Zone", "Transit Hubs"],
-                                "supervisor": "Officer Davis"
-                            }
-                        ]
-                    },
-                    {
-                        "district": "westside",
-                        "shifts": [
-                            {
-                                "name": "Morning",
-                                "timeRange": "06:00-14:00",
-                                "officers": 8,
-                                "vehicles": 3,
-                                "priorityAreas": ["Residential Areas", "Schools"],
-                                "supervisor": "Officer Miller"
-                            },
-                            {
-                                "name": "Afternoon",
-                                "timeRange": "14:00-22:00",
-                                "officers": 10,
-                                "vehicles": 4,
-                                "priorityAreas": ["Shopping Centers", "Parks"],
-                                "supervisor": "Officer Brown"
-                            },
-                            {
-                                "name": "Night",
-                                "timeRange": "22:00-06:00",
-                                "officers": 7,
-                                "vehicles": 3,
-                                "priorityAreas": ["Residential Areas", "Commercial Areas"],
-                                "supervisor": "Officer Wilson"
-                            }
-                        ]
-                    }
-                ]
+                "schedules": _SCHEDULES_MOCK
             }
-        )
+        ))
+        return etag_json_response(request, content, make_etag(content))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -170,97 +115,66 @@ async def get_patrol_schedule(
 
 @router.post("/optimize", response_model=dict)
 async def optimize_resources(
-    optimization_data: Dict[str, Any],
+    optimization_data: OptimizationRequest,
     session: Session = Depends(get_session),
     _: User = Depends(check_permissions(["manage_resources"]))
 ):
     """Generate optimized resource allocation recommendations"""
     try:
-        # Validate constraints
-        constraints = optimization_data.get("constraints", {})
-        if constraints.get("minCoverage", 0) > 90:
+        districts = _ALLOCATION_MOCK["allocation"]
+        current_officers = np.array([d.resources.officers for d in districts])
+        coverage = np.array([d.coverage for d in districts], dtype=np.float64)
+        response_time = np.array([d.responseTime for d in districts])
+        
+        # minCoverage is the lowest projected coverage (%) any district may drop to; without it,
+        # no district falls below today's worst-covered district
+        constraints = optimization_data.constraints
+        min_coverage = (
+            constraints.min_coverage
+            if constraints and constraints.min_coverage is not None
+            else float(coverage.min())
+        )
+        
+        # Rebalance the current allocation towards higher-risk districts above the coverage floors
+        try:
+            officers, vehicles = optimize_allocation(
+                officers=current_officers,
+                vehicles=np.array([d.resources.vehicles for d in districts]),
+                risk_weight=np.array([RISK_WEIGHTS.get(d.risk, 1.0) for d in districts]),
+                coverage=coverage,
+                min_coverage=min_coverage
+            )
+        except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
                     "code": "invalid_constraints",
                     "message": "Resource constraints cannot be satisfied",
-                    "details": "Minimum coverage requirements cannot be met with the specified number of officers"
+                    "details": str(e)
                 }
             )
         
-        # In a real application, we'd use actual optimization algorithms
-        # For now, we'll return mock data
-        return ResponseModel.success(
-            data={
-                "optimizationId": "opt_123456",
-                "status": "completed",
-                "currentAllocation": {
-                    "downtown": {
-                        "officers": 45,
-                        "vehicles": 18
-                    },
-                    "westside": {
-                        "officers": 25,
-                        "vehicles": 10
-                    },
-                    "eastside": {
-                        "officers": 20,
-                        "vehicles": 8
-                    },
-                    "northside": {
-                        "officers": 18,
-                        "vehicles": 7
-                    },
-                    "southside": {
-                        "officers": 16,
-                        "vehicles": 6
-                    }
-                },
-                "recommendedAllocation": {
-                    "downtown": {
-                        "officers": 42,
-                        "vehicles": 16
-                    },
-                    "westside": {
-                        "officers": 28,
-                        "vehicles": 11
-                    },
-                    "eastside": {
-                        "officers": 24,
-                        "vehicles": 9
-                    },
-                    "northside": {
-                        "officers": 16,
-                        "vehicles": 6
-                    },
-                    "southside": {
-                        "officers": 14,
-                        "vehicles": 5
-                    }
-                },
-                "impact": {
-                    "responseTime": {
-                        "downtown": "-0.2 min",
-                        "westside": "-0.8 min",
-                        "eastside": "-0.7 min",
-                        "northside": "+0.3 min",
-                        "southside": "+0.5 min"
-                    },
-                    "coverage": {
-                        "downtown": "-2%",
-                        "westside": "+5%",
-                        "eastside": "+4%",
-                        "northside": "-1%",
-                        "southside": "-2%"
-                    },
-                    "overall": {
-                        "averageResponseTime": "-0.2 min",
-                        "averageCoverage": "+1.5%",
-                        "predictedCrimeReduction": "+3.2%"
-                    }
+        # Impact follows from the same coverage model the constraint uses
+        new_coverage, new_response_time = project_impact(current_officers, officers, coverage, response_time)
+        coverage_delta = new_coverage - coverage
+        response_delta = new_response_time - response_time
+        
+        return ResponseModel.success(data={
+            **_OPTIMIZE_MOCK,
+            "recommendedAllocation": {
+                d.district: {"officers": int(o), "vehicles": int(v)}
+                for d, o, v in zip(districts, officers, vehicles)
+            },
+            "impact": {
+                "responseTime": {d.district: f"{delta:+.1f} min" for d, delta in zip(districts, response_delta)},
+                "coverage": {d.district: f"{delta:+.0f}%" for d, delta in zip(districts, coverage_delta)},
+                "overall": {
+                    "averageResponseTime": f"{response_delta.mean():+.1f} min",
+                    "averageCoverage": f"{coverage_delta.mean():+.1f}%"
                 }
-            }
-        )
+            },
+            "minCoverage": min_coverage
+        })
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+# Fixed-shape default structures; field names match the JSON keys they serialize to
+
+@dataclass(slots=True, frozen=True)
+class PasswordPolicy:
+    minLength: int = 8
+    requireUppercase: bool = True
+    requireLowercase: bool = True
+    requireNumbers: bool = True
+    requireSpecialChars: bool = True
+    expiryDays: int = 90
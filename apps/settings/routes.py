@@ -1,56 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlmodel import Session
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+import orjson
 
+from apps.settings.models import PasswordPolicy
 from apps.users.models import User
 from core.database import get_session
-from core.utils.common import ResponseModel
+from core.utils.common import ResponseModel, make_etag, etag_json_response
 from core.utils.security import get_current_user, check_permissions
 
 router = APIRouter()
 
-@router.get("/system", response_model=dict)
+# Default settings, built once at import instead of on every request
+_PASSWORD_POLICY_DEFAULT = PasswordPolicy()
+
+_SYSTEM_SETTINGS_DEFAULT = {
+    "general": {
+        "systemName": "Crime Analysis Platform",
+        "defaultLanguage": "en",
+        "defaultTimezone": "America/New_York",
+        "dateFormat": "MM/DD/YYYY"
+    },
+    "security": {
+        "sessionTimeout": 30,
+        "passwordPolicy": _PASSWORD_POLICY_DEFAULT,
+        "twoFactorAuthEnabled": True
+    },
+    "notifications": {
+        "emailEnabled": True,
+        "pushEnabled": True,
+        "alertThreshold": "medium"
+    },
+    "analytics": {
+        "dataRetentionDays": 365,
+        "predictiveModelVersion": "v2.3.1",
+        "autoRefreshInterval": 5
+    }
+}
+
+_USER_SETTINGS_DEFAULT = {
+    "preferences": {
+        "language": "en",
+        "timezone": "America/New_York",
+        "dateFormat": "MM/DD/YYYY",
+        "theme": "light",
+        "density": "comfortable"
+    },
+    "notifications": {
+        "email": True,
+        "push": True,
+        "highRiskAlerts": True,
+        "predictiveAlerts": True,
+        "reportGeneration": True
+    },
+    "dashboard": {
+        "defaultView": "overview",
+        "autoRefresh": True,
+        "refreshInterval": 5,
+        "widgets": [
+            "crime-heatmap",
+            "recent-alerts",
+            "crime-type-chart",
+            "predictive-analysis"
+        ]
+    }
+}
+
+# Static GET responses serialized once; served as raw bytes without response-model encoding
+_SYSTEM_SETTINGS_JSON = orjson.dumps(ResponseModel.success(data={"settings": _SYSTEM_SETTINGS_DEFAULT}))
+_USER_SETTINGS_JSON = orjson.dumps(ResponseModel.success(data={"settings": _USER_SETTINGS_DEFAULT}))
+_SYSTEM_SETTINGS_ETAG = make_etag(_SYSTEM_SETTINGS_JSON)
+_USER_SETTINGS_ETAG = make_etag(_USER_SETTINGS_JSON)
+
+_NO_OVERRIDES: Mapping[str, Any] = MappingProxyType({})
+
+def _deep_merge(defaults: Dict[str, Any], overrides: Mapping[str, Any]) -> Dict[str, Any]:
+    """Overlay known section keys from overrides onto a two-level settings template"""
+    merged = {}
+    for section, section_defaults in defaults.items():
+        section_overrides = overrides.get(section) or _NO_OVERRIDES
+        if not section_overrides:
+            merged[section] = dict(section_defaults)
+            continue
+        
+        merged[section] = {
+            key: section_overrides.get(key, value) for key, value in section_defaults.items()
+        }
+    return merged
+
+@router.get("/system")
 async def get_system_settings(
+    request: Request,
     session: Session = Depends(get_session),
     _: User = Depends(check_permissions(["view_system_settings"]))
 ):
     """Get system settings"""
     # In a real application, we'd fetch this from the database
     # For now, we'll return mock data
-    return ResponseModel.success(
-        data={
-            "settings": {
-                "general": {
-                    "systemName": "Crime Analysis Platform",
-                    "defaultLanguage": "en",
-                    "defaultTimezone": "America/New_York",
-                    "dateFormat": "MM/DD/YYYY"
-                },
-                "security": {
-                    "sessionTimeout": 30,
-                    "passwordPolicy": {
-                        "minLength": 8,
-                        "requireUppercase": True,
-                        "requireLowercase": True,
-                        "requireNumbers": True,
-                        "requireSpecialChars": True,
-                        "expiryDays": 90
-                    },
-                    "twoFactorAuthEnabled": True
-                },
-                "notifications": {
-                    "emailEnabled": True,
-                    "pushEnabled": True,
-                    "alertThreshold": "medium"
-                },
-                "analytics": {
-                    "dataRetentionDays": 365,
-                    "predictiveModelVersion": "v2.3.1",
-                    "autoRefreshInterval": 5
-                }
-            }
-        }
-    )
+    return etag_json_response(request, _SYSTEM_SETTINGS_JSON, _SYSTEM_SETTINGS_ETAG)
 
 @router.put("/system", response_model=dict)
 async def update_system_settings(
@@ -76,80 +124,22 @@ async def update_system_settings(
     
     # In a real application, we'd save this to the database
     # For now, we'll just return success with the mock data
-    return ResponseModel.success(
-        data={
-            "settings": {
-                "general": {
-                    "systemName": "Crime Analysis Platform",
-                    "defaultLanguage": settings_data.get("general", {}).get("defaultLanguage", "en"),
-                    "defaultTimezone": settings_data.get("general", {}).get("defaultTimezone", "America/New_York"),
-                    "dateFormat": settings_data.get("general", {}).get("dateFormat", "MM/DD/YYYY")
-                },
-                "security": {
-                    "sessionTimeout": settings_data.get("security", {}).get("sessionTimeout", 30),
-                    "passwordPolicy": settings_data.get("security", {}).get("passwordPolicy", {
-                        "minLength": 8,
-                        "requireUppercase": True,
-                        "requireLowercase": True,
-                        "requireNumbers": True,
-                        "requireSpecialChars": True,
-                        "expiryDays": 90
-                    }),
-                    "twoFactorAuthEnabled": settings_data.get("security", {}).get("twoFactorAuthEnabled", True)
-                },
-                "notifications": {
-                    "emailEnabled": settings_data.get("notifications", {}).get("emailEnabled", True),
-                    "pushEnabled": settings_data.get("notifications", {}).get("pushEnabled", True),
-                    "alertThreshold": settings_data.get("notifications", {}).get("alertThreshold", "medium")
-                },
-                "analytics": {
-                    "dataRetentionDays": settings_data.get("analytics", {}).get("dataRetentionDays", 365),
-                    "predictiveModelVersion": settings_data.get("analytics", {}).get("predictiveModelVersion", "v2.3.1"),
-                    "autoRefreshInterval": settings_data.get("analytics", {}).get("autoRefreshInterval", 5)
-                }
-            }
-        }
-    )
+    settings = _deep_merge(_SYSTEM_SETTINGS_DEFAULT, settings_data)
+    # The system name is not user-editable
+    settings["general"]["systemName"] = _SYSTEM_SETTINGS_DEFAULT["general"]["systemName"]
+    
+    return ResponseModel.success(data={"settings": settings})
 
-@router.get("/user", response_model=dict)
+@router.get("/user")
 async def get_user_settings(
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get settings for the current user"""
     # In a real application, we'd fetch this from the database
     # For now, we'll return mock data
-    return ResponseModel.success(
-        data={
-            "settings": {
-                "preferences": {
-                    "language": "en",
-                    "timezone": "America/New_York",
-                    "dateFormat": "MM/DD/YYYY",
-                    "theme": "light",
-                    "density": "comfortable"
-                },
-                "notifications": {
-                    "email": True,
-                    "push": True,
-                    "highRiskAlerts": True,
-                    "predictiveAlerts": True,
-                    "reportGeneration": True
-                },
-                "dashboard": {
-                    "defaultView": "overview",
-                    "autoRefresh": True,
-                    "refreshInterval": 5,
-                    "widgets": [
-                        "crime-heatmap",
-                        "recent-alerts",
-                        "crime-type-chart",
-                        "predictive-analysis"
-                    ]
-                }
-            }
-        }
-    )
+    return etag_json_response(request, _USER_SETTINGS_JSON, _USER_SETTINGS_ETAG)
 
 @router.put("/user", response_model=dict)
 async def update_user_settings(
@@ -176,33 +166,5 @@ async def update_user_settings(
     # In a real application, we'd save this to the database
     # For now, we'll just return success with the mock data
     return ResponseModel.success(
-        data={
-            "settings": {
-                "preferences": {
-                    "language": settings_data.get("preferences", {}).get("language", "en"),
-                    "timezone": settings_data.get("preferences", {}).get("timezone", "America/New_York"),
-                    "dateFormat": settings_data.get("preferences", {}).get("dateFormat", "MM/DD/YYYY"),
-                    "theme": settings_data.get("preferences", {}).get("theme", "light"),
-                    "density": settings_data.get("preferences", {}).get("density", "comfortable")
-                },
-                "notifications": {
-                    "email": settings_data.get("notifications", {}).get("email", True),
-                    "push": settings_data.get("notifications", {}).get("push", True),
-                    "highRiskAlerts": settings_data.get("notifications", {}).get("highRiskAlerts", True),
-                    "predictiveAlerts": settings_data.get("notifications", {}).get("predictiveAlerts", True),
-                    "reportGeneration": settings_data.get("notifications", {}).get("reportGeneration", True)
-                },
-                "dashboard": {
-                    "defaultView": settings_data.get("dashboard", {}).get("defaultView", "overview"),
-                    "autoRefresh": settings_data.get("dashboard", {}).get("autoRefresh", True),
-                    "refreshInterval": settings_data.get("dashboard", {}).get("refreshInterval", 5),
-                    "widgets": settings_data.get("dashboard", {}).get("widgets", [
-                        "crime-heatmap",
-                        "recent-alerts",
-                        "crime-type-chart",
-                        "predictive-analysis"
-                    ])
-                }
-            }
-        }
+        data={"settings": _deep_merge(_USER_SETTINGS_DEFAULT, settings_data)}
     )
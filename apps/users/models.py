@@ -1,11 +1,35 @@
-from typing import Optional, Dict, Any
+from typing import Optional, List, Annotated
 from datetime import datetime
 from uuid import UUID
-from sqlmodel import SQLModel, Field, JSON
-from pydantic import BaseModel, EmailStr
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from pydantic import BaseModel, StringConstraints
+
+from core.database import JSONVariant
+
+# Lightweight email shape check; uniqueness is enforced by the database
+EmailAddress = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, max_length=254, pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+]
 
 class User(SQLModel, table=True):
     """User model"""
+    __table_args__ = (
+        # Keyset pagination on (created_at DESC, id DESC); btree scans it backwards
+        Index("ix_users_created_id", "created_at", "id"),
+        # get_users filters: role (optionally with district) and district alone
+        Index("ix_users_role_district", "role", "district"),
+        Index("ix_users_district", "district"),
+        # Serves `permissions @> '["view_users"]'` lookups
+        Index(
+            "ix_users_permissions_gin",
+            "permissions",
+            postgresql_using="gin",
+            postgresql_ops={"permissions": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     id: UUID = Field(primary_key=True)
     name: str
     email: str = Field(unique=True, index=True)
@@ -14,8 +38,8 @@ class User(SQLModel, table=True):
     district: Optional[str] = None
     department: Optional[str] = None
     phone: Optional[str] = None
-    badge_number: Optional[str] = None
-    permissions: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)  # Store as JSON
+    badge_number: Optional[str] = Field(default=None, unique=True, index=True, nullable=True)
+    permissions: Optional[List[str]] = Field(default=None, sa_type=JSONVariant)  # JSONB on PostgreSQL
     join_date: Optional[datetime] = None
     last_active: Optional[datetime] = None
     profile_complete: Optional[int] = None
@@ -25,7 +49,7 @@ class User(SQLModel, table=True):
 class UserCreate(BaseModel):
     """User create schema"""
     name: str
-    email: EmailStr
+    email: EmailAddress
     password: str
     role: str
     district: Optional[str] = None
@@ -36,12 +60,12 @@ class UserCreate(BaseModel):
 class UserUpdate(SQLModel):
     """User update schema"""
     name: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[EmailAddress] = None
     district: Optional[str] = None
     department: Optional[str] = None
     phone: Optional[str] = None
     badge_number: Optional[str] = None
-    permissions: Optional[Dict[str, Any]] = None  # Changed from List to Dict
+    permissions: Optional[List[str]] = None
     role: Optional[str] = None
 
 class UserRead(BaseModel):
@@ -54,7 +78,7 @@ class UserRead(BaseModel):
     department: Optional[str] = None
     phone: Optional[str] = None
     badge_number: Optional[str] = None
-    permissions: Optional[Dict[str, Any]] = None  # Changed from List to Dict
+    permissions: Optional[List[str]] = None
     join_date: Optional[datetime] = None
     last_active: Optional[datetime] = None
     profile_complete: Optional[int] = None
@@ -4,52 +4,71 @@ from sqlmodel import Session
 from uuid import UUID, uuid4
 
 from apps.users.models import User, UserCreate, UserUpdate
+from apps.users.services import UserService
 from core.database import get_session
 from core.utils.common import ResponseModel
-from core.utils.security import get_current_user, check_permissions
-from datetime import datetime
+from core.utils.security import get_current_user, check_permissions, permission_set
+from datetime import datetime, timezone
 
 router = APIRouter()
 
+# Static mock profile served by get_user; built once and never mutated
+_MOCK_USER_DETAIL = {
+    "id": "usr_123456",
+    "name": "John Doe",
+    "email": "john.doe@example.com",
+    "role": "analyst",
+    "district": "downtown",
+    "phone": "+1-555-123-4567",
+    "badgeNumber": "A12345",
+    "department": "Crime Analysis Unit",
+    "joinDate": "2023-06-15T00:00:00Z",
+    "permissions": ("view_incidents", "edit_incidents", "view_reports", "create_reports"),
+    "lastActive": "2025-03-14T20:15:00Z",
+    "profileComplete": 75
+}
+
 @router.get("/", response_model=dict)
 async def list_users(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     role: Optional[str] = None,
     district: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all matching users"),
     session: Session = Depends(get_session),
     _: User = Depends(check_permissions(["view_users"]))
 ):
     """List users with optional filtering"""
-    # In a real application, we'd implement proper filtering and pagination
-    # For now, we'll return mock data
-    users = [
-        {
-            "id": "usr_123456",
-            "name": "John Doe",
-            "email": "john.doe@example.com",
-            "role": "analyst",
-            "district": "downtown",
-            "lastActive": "2025-03-14T20:15:00Z"
-        },
-        {
-            "id": "usr_123457",
-            "name": "Jane Smith",
-            "email": "jane.smith@example.com",
-            "role": "officer",
-            "district": "westside",
-            "lastActive": "2025-03-14T18:30:00Z"
-        }
-    ]
+    try:
+        users, total, next_cursor = UserService.get_users(
+            session=session,
+            page=page,
+            limit=limit,
+            role=role,
+            district=district,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "invalid_parameter",
+                "message": str(e)
+            }
+        )
     
     return ResponseModel.success(
         data={
             "users": users,
             "pagination": {
-                "total": 42,
+                "total": total,
                 "page": page,
                 "limit": limit,
-                "pages": 3
+                "pages": (total + limit - 1) // limit if total is not None else None,
+                "has_more": next_cursor is not None,
+                "next_cursor": next_cursor
             }
         }
     )
@@ -62,7 +81,7 @@ async def get_user(
 ):
     """Get user details"""
     # Allow users to view their own profile or users with view_users permission
-    if current_user.id != user_id and "view_users" not in (current_user.permissions or []):
+    if current_user.id != user_id and "view_users" not in permission_set(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={
@@ -74,21 +93,7 @@ async def get_user(
     # In a real application, we'd fetch from the database
     # For now, mock data
     if user_id == "usr_123456":
-        user = {
-            "id": "usr_123456",
-            "name": "John Doe",
-            "email": "john.doe@example.com",
-            "role": "analyst",
-            "district": "downtown",
-            "phone": "+1-555-123-4567",
-            "badgeNumber": "A12345",
-            "department": "Crime Analysis Unit",
-            "joinDate": "2023-06-15T00:00:00Z",
-            "permissions": ["view_incidents", "edit_incidents", "view_reports", "create_reports"],
-            "lastActive": "2025-03-14T20:15:00Z",
-            "profileComplete": 75
-        }
-        return ResponseModel.success(data={"user": user})
+        return ResponseModel.success(data={"user": _MOCK_USER_DETAIL})
     
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -108,7 +113,7 @@ async def create_user(
     try:
         # In a real application, we'd check for duplicate email/badge number
         # and save to the database
-        
+        now = datetime.now(timezone.utc)
         user = {
             "id": uuid4(),
             "name": user_data.name,
@@ -118,8 +123,8 @@ async def create_user(
             "department": user_data.department,
             "phone": user_data.phone,
             "badgeNumber": user_data.badge_number,
-            "joinDate": datetime.utcnow().isoformat(),
-            "createdAt": datetime.utcnow().isoformat()
+            "joinDate": now,
+            "createdAt": now
         }
         
         return ResponseModel.success(data={"user": user})
@@ -145,7 +150,7 @@ async def update_user(
 ):
     """Update a user"""
     # Allow users to update their own profile or users with update_users permission
-    if current_user.id != user_id and "update_users" not in (current_user.permissions or []):
+    if current_user.id != user_id and "update_users" not in permission_set(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={
@@ -156,6 +161,7 @@ async def update_user(
     
     # In a real application, we'd update the database
     # For now, mock response
+    now = datetime.now(timezone.utc)
     user = {
         "id": user_id,
         "name": user_data.name if user_data.name else "Robert M. Johnson",
@@ -163,7 +169,7 @@ async def update_user(
         "role": user_data.role if user_data.role else "officer",
         "district": user_data.district if user_data.district else "eastside",
         "department": user_data.department if user_data.department else "Special Investigations Unit",
-        "updatedAt": datetime.utcnow().isoformat()
+        "updatedAt": now
     }
     
     return ResponseModel.success(data={"user": user})
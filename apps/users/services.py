@@ -1,10 +1,59 @@
 from uuid import UUID, uuid4
-from typing import Optional, Tuple, List
+from typing import Any, Optional, Tuple, List, Dict, Iterable
 from datetime import datetime
+from pydantic import TypeAdapter
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
 from apps.users.models import User, UserCreate, UserRead, UserUpdate
-from core.utils.security import hash_password
+from core.utils.common import encode_cursor, decode_cursor
+from core.utils.security import hash_password, verify_password
+
+# Default permissions granted to each role on creation
+_PERMISSION_MAP: Dict[str, Tuple[str, ...]] = {
+    "admin": ("admin",),  # Admin has all permissions
+    "analyst": (
+        "view_incidents", "view_reports", "create_reports",
+        "view_alerts", "view_analytics"
+    ),
+    "officer": (
+        "view_incidents", "create_incidents", "update_incidents",
+        "view_alerts", "view_reports"
+    ),
+    "supervisor": (
+        "view_incidents", "create_incidents", "update_incidents", "delete_incidents",
+        "view_users", "view_reports", "create_reports", "view_alerts", "create_alerts",
+        "view_analytics"
+    ),
+}
+
+# Unique index create_all builds for User.badge_number (unique=True, index=True)
+_BADGE_NUMBER_INDEX = "ix_user_badge_number"
+
+# Columns an update may change but never clear
+_NON_NULLABLE_FIELDS = frozenset({"name", "email", "role"})
+
+def _user_to_read(user: User) -> UserRead:
+    """Build a UserRead from a loaded User without re-running validation"""
+    # Trust boundary: rows come from our own table, so they already satisfy the schema
+    return UserRead.model_construct(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        role=user.role,
+        district=user.district,
+        department=user.department,
+        phone=user.phone,
+        badge_number=user.badge_number,
+        permissions=user.permissions,
+        join_date=user.join_date,
+        last_active=user.last_active,
+        profile_complete=user.profile_complete
+    )
+
+# Serializes a whole page of users in a single call instead of one model at a time
+_USER_READ_LIST = TypeAdapter(List[UserRead])
 
 class UserService:
     """Service for user-related operations"""
@@ -15,33 +64,49 @@ class UserService:
         page: int = 1, 
         limit: int = 20,
         role: Optional[str] = None,
-        district: Optional[str] = None
-    ) -> Tuple[List[UserRead], int]:
-        """Get users with optional filtering"""
-        query = select(User)
+        district: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+        """Get users with optional filtering, newest first, as JSON-ready dicts
+
+        Pass the previous call's next_cursor to page with a keyset seek
+        instead of OFFSET. The total is only counted when include_total is set.
+        """
+        filters = []
         
         # Apply filters if provided
         if role:
-            query = query.where(User.role == role)
+            filters.append(User.role == role)
         if district:
-            query = query.where(User.district == district)
+            filters.append(User.district == district)
         
-        # Get total count
-        total = session.exec(query).count()
+        query = select(User).where(*filters)
         
-        # Apply pagination
-        offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
+        # Count in the database, and only when the caller asks for it
+        total = None
+        if include_total:
+            total = session.exec(select(func.count()).select_from(User).where(*filters)).one()
+        
+        # Apply pagination; fetch one extra row to know whether another page exists
+        query = query.order_by(User.created_at.desc(), User.id.desc())
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(tuple_(User.created_at, User.id) < (cursor_created_at, cursor_id))
+        else:
+            query = query.offset((page - 1) * limit)
         
         # Execute query
-        users = session.exec(query).all()
+        users = session.exec(query.limit(limit + 1)).all()
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
         
-        # Convert to UserRead models
-        user_reads = [
-            UserRead.from_orm(user) for user in users
-        ]
+        # Serialize the whole page in one pydantic-core call
+        user_reads = _USER_READ_LIST.dump_python([_user_to_read(user) for user in users], mode="json")
         
-        return user_reads, total
+        return user_reads, total, next_cursor
     
     @staticmethod
     def get_user_by_id(session: Session, user_id: UUID) -> Optional[User]:
@@ -56,48 +121,66 @@ class UserService:
         # Query using the UUID object
         return session.exec(select(User).where(User.id == user_id)).first()
     
+    @staticmethod
+    def get_users_by_ids(session: Session, user_ids: Iterable[UUID]) -> Dict[UUID, User]:
+        """Get many users in one query, keyed by ID (use instead of get_user_by_id in loops)"""
+        ids = tuple(set(user_ids))
+        if not ids:
+            return {}
+        
+        users = session.exec(select(User).where(User.id.in_(ids))).all()
+        return {user.id: user for user in users}
+    
     @staticmethod
     def get_user_by_email(session: Session, email: str) -> Optional[User]:
         """Get a user by email"""
         return session.exec(select(User).where(User.email == email)).first()
     
+    @staticmethod
+    def email_exists(session: Session, email: str) -> bool:
+        """Check whether an email is taken without loading the user row"""
+        return session.exec(select(User.id).where(User.email == email).limit(1)).first() is not None
+    
+    @staticmethod
+    def badge_number_exists(session: Session, badge_number: str) -> bool:
+        """Check whether a badge number is taken without loading the user row"""
+        return session.exec(
+            select(User.id).where(User.badge_number == badge_number).limit(1)
+        ).first() is not None
+    
     @staticmethod
     def create_user(session: Session, user_data: UserCreate) -> UserRead:
         """Create a new user"""
-        # Check if email already exists
-        existing_user = UserService.get_user_by_email(session, user_data.email)
-        if existing_user:
-            raise ValueError("Email already in use")
-            
-        # Check if badge number exists and is unique
-        if user_data.badge_number:
-            badge_exists = session.exec(
-                select(User).where(User.badge_number == user_data.badge_number)
-            ).first()
-            if badge_exists:
-                raise ValueError("Badge number must be unique")
+        # Email and badge number uniqueness are enforced by unique indexes
+        now = datetime.utcnow()
         
         # Create user instance
         user = User(
             id=uuid4(),
             name=user_data.name,
             email=user_data.email,
-            password=hash_password(user_data.password),
+            hashed_password=hash_password(user_data.password),
             role=user_data.role,
             district=user_data.district,
             department=user_data.department,
             phone=user_data.phone,
             badge_number=user_data.badge_number,
             # Set default permissions based on role
-            permissions=UserService._get_default_permissions(user_data.role)
+            permissions=UserService._get_default_permissions(user_data.role),
+            created_at=now,
+            updated_at=now
         )
         
-        # Save to database
+        # Save to database; a duplicate email/badge fails the INSERT itself
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        try:
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(UserService._unique_violation_message(e))
         
-        return UserRead.from_orm(user)
+        # Every column was set in Python and expire_on_commit=False keeps them loaded
+        return _user_to_read(user)
     
     @staticmethod
     def update_user(
@@ -106,41 +189,45 @@ class UserService:
         user_data: UserUpdate
     ) -> Optional[UserRead]:
         """Update a user"""
-        user = session.exec(select(User).where(User.id == user_id)).first()
+        # Single UPDATE ... RETURNING instead of SELECT + per-attribute setattr + refresh
+        changes = user_data.model_dump(exclude_unset=True)
+        
+        # An explicit null would otherwise surface as a misleading constraint error
+        cleared = sorted(field for field in _NON_NULLABLE_FIELDS if field in changes and changes[field] is None)
+        if cleared:
+            raise ValueError(f"Fields cannot be null: {', '.join(cleared)}")
+        
+        # Never write a plaintext password column; hash (slow by design) at most once, and
+        # only when the password really changed. The RETURNING path has no stored hash, so
+        # the password case reads just that column first
+        new_password = changes.pop("password", None)
+        if new_password:
+            stored_hash = session.exec(select(User.hashed_password).where(User.id == user_id)).first()
+            if stored_hash is None:
+                return None
+            if not verify_password(new_password, stored_hash):
+                changes["hashed_password"] = hash_password(new_password)
+        
+        changes["updated_at"] = datetime.utcnow()
+        statement = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**changes)
+            .returning(User)
+        )
+        
+        # Unique indexes reject a duplicate email/badge
+        try:
+            user = session.exec(statement).scalar_one_or_none()
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(UserService._unique_violation_message(e))
         
         if not user:
             return None
-            
-        # Check email uniqueness if being updated
-        if user_data.email and user_data.email != user.email:
-            existing_email = session.exec(
-                select(User).where(User.email == user_data.email)
-            ).first()
-            if existing_email:
-                raise ValueError("Email already in use")
-                
-        # Check badge number uniqueness if being updated
-        if user_data.badge_number and user_data.badge_number != user.badge_number:
-            badge_exists = session.exec(
-                select(User).where(User.badge_number == user_data.badge_number)
-            ).first()
-            if badge_exists:
-                raise ValueError("Badge number must be unique")
-        
-        # Update user fields
-        user_data_dict = user_data.dict(exclude_unset=True)
-        for key, value in user_data_dict.items():
-            setattr(user, key, value)
-            
-        # Update timestamps
-        user.updated_at = datetime.utcnow()
-        
-        # Save changes
-        session.add(user)
-        session.commit()
-        session.refresh(user)
         
-        return UserRead.from_orm(user)
+        return _user_to_read(user)
     
     @staticmethod
     def delete_user(session: Session, user_id: UUID) -> bool:
@@ -155,24 +242,22 @@ class UserService:
         
         return True
     
+    @staticmethod
+    def _unique_violation_message(error: IntegrityError) -> str:
+        """Map a unique-index violation on users to a client-facing message"""
+        # PostgreSQL drivers report the violated index by name; SQLite only mentions the column
+        constraint = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+        if constraint:
+            badge_collided = constraint == _BADGE_NUMBER_INDEX
+        else:
+            badge_collided = "badge_number" in str(error.orig)
+        
+        if badge_collided:
+            return "Badge number must be unique"
+        return "Email already in use"
+    
     @staticmethod
     def _get_default_permissions(role: str) -> List[str]:
         """Get default permissions based on role"""
-        permission_map = {
-            "admin": ["admin"],  # Admin has all permissions
-            "analyst": [
-                "view_incidents", "view_reports", "create_reports", 
-                "view_alerts", "view_analytics"
-            ],
-            "officer": [
-                "view_incidents", "create_incidents", "update_incidents",
-                "view_alerts", "view_reports"
-            ],
-            "supervisor": [
-                "view_incidents", "create_incidents", "update_incidents", "delete_incidents",
-                "view_users", "view_reports", "create_reports", "view_alerts", "create_alerts",
-                "view_analytics"
-            ]
-        }
-        
-        return permission_map.get(role.lower(), [])
\ No newline at end of file
+        # Copy so the stored JSON value never aliases the shared defaults
+        return list(_PERMISSION_MAP.get(role.lower(), ()))
\ No newline at end of file
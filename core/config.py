@@ -1,9 +1,11 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
+# The single place .env is loaded; everything else reads settings or os.environ
 load_dotenv()
 
 class Settings(BaseSettings):
@@ -13,7 +15,7 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     
     # Database
-    DATABASE_URL: str = Field(default=os.getenv("DATABASE_URL", "sqlite:///./crime-analysis.db"))
+    DATABASE_URL: Optional[str] = None  # core.database falls back to SQLite when unset
     
     # Authentication
     SECRET_KEY: str = Field(default=os.getenv("SECRET_KEY", "supersecretkey"))
@@ -34,4 +36,9 @@ class Settings(BaseSettings):
     class Config:
         case_sensitive = True
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsed from the environment once"""
+    return Settings()
+
+settings = get_settings()
\ No newline at end of file
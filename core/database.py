@@ -1,34 +1,71 @@
 import os
-from typing import Generator
+from typing import Generator, Dict, Any
 import logging
+from sqlalchemy import JSON, and_, event, literal
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import SQLModel, Session, create_engine
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from core.config import get_settings
+
 logger = logging.getLogger(__name__)
 
-# Get database URL from environment
-DATABASE_URL = os.getenv("DATABASE_URL")
+# Get database URL from the shared settings (.env is loaded by core.config)
+DATABASE_URL = get_settings().DATABASE_URL
 
 if not DATABASE_URL:
     logger.warning("DATABASE_URL not set in environment. Using sqlite database.")
     DATABASE_URL = "sqlite:///./sql_app.db"
 
-# Create the SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL, 
-    echo=False,
-    connect_args={}
-)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
 
-# Add connect_args to SQLite connection for foreign key support
-if DATABASE_URL.startswith("sqlite"):
+# Create the single shared SQLAlchemy engine
+if IS_SQLITE:
+    # SQLite connections are shared across FastAPI's threadpool workers
     engine = create_engine(
         DATABASE_URL,
         echo=False,
         connect_args={"check_same_thread": False}
     )
+else:
+    # Keep warm connections around instead of reconnecting per request
+    engine = create_engine(
+        DATABASE_URL,
+        echo=False,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Use WAL journaling so readers don't block the writer"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+# JSON column type that is stored as JSONB on PostgreSQL so it can carry a GIN index
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+def json_contains(column, value: Dict[str, Any]):
+    """Filter rows whose JSON column contains the given key/value pairs"""
+    if engine.dialect.name == "postgresql":
+        # `@>` containment is served by the jsonb_path_ops GIN index
+        return column.op("@>", is_comparison=True)(literal(value, JSONB))
+    
+    return and_(*(column[key].as_string() == val for key, val in value.items()))
+
+def enable_local_jit(session: Session, above_cost: int = 100000) -> None:
+    """Enable PostgreSQL JIT for the current transaction only (used for heavy aggregates)"""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    
+    # SET LOCAL is reverted on commit/rollback, so short queries elsewhere are unaffected
+    connection = session.connection()
+    connection.exec_driver_sql("SET LOCAL jit = on")
+    connection.exec_driver_sql(f"SET LOCAL jit_above_cost = {int(above_cost)}")
 
 def create_db_and_tables():
     """Create database tables if they don't exist"""
@@ -41,7 +78,9 @@ def create_db_and_tables():
 
 def get_session() -> Generator[Session, None, None]:
     """Get database session"""
-    with Session(engine) as session:
+    # Request-scoped sessions don't need attributes expired on commit; keeping them
+    # avoids a reload SELECT when the committed instance is serialized
+    with Session(engine, expire_on_commit=False) as session:
         try:
             yield session
         except Exception as e:
@@ -0,0 +1,71 @@
+from typing import Tuple
+
+import numpy as np
+
+# Relative patrol weight per district risk level
+RISK_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+
+def coverage_floor(current: np.ndarray, coverage: np.ndarray, min_coverage: float) -> np.ndarray:
+    """Smallest count per district whose projected coverage still reaches min_coverage
+
+    Coverage is modelled as proportional to the resources assigned to a district, so a district
+    at `coverage`% with `current` units needs current * min_coverage / coverage units. Every
+    district keeps at least one unit.
+    """
+    floor = np.ceil(current * min_coverage / coverage - 1e-9).astype(np.int64)
+    return np.maximum(floor, 1)
+
+def _apportion(current: np.ndarray, weight: np.ndarray, floor: np.ndarray) -> np.ndarray:
+    """Redistribute one integer resource pool in proportion to weight above per-district floors"""
+    total = int(current.sum())
+    remaining = total - int(floor.sum())
+    if remaining < 0:
+        raise ValueError("Minimum coverage requirements cannot be met with the specified number of officers")
+
+    # Split the rest by weight, then hand out leftover units by largest remainder
+    share = weight / weight.sum() * remaining
+    allocation = floor + np.floor(share).astype(np.int64)
+    leftover = total - int(allocation.sum())
+    if leftover > 0:
+        order = np.argsort(-(share - np.floor(share)), kind="stable")
+        allocation[order[:leftover]] += 1
+
+    return allocation
+
+def optimize_allocation(
+    officers: np.ndarray,
+    vehicles: np.ndarray,
+    risk_weight: np.ndarray,
+    coverage: np.ndarray,
+    min_coverage: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Recommend officer and vehicle counts per district, keeping totals fixed
+
+    Officers are shifted towards risk while every district keeps enough of them for its
+    projected coverage to stay at or above min_coverage (a percentage); raises ValueError
+    when the officer total cannot satisfy that. Vehicles then follow the officers.
+    """
+    officers = np.asarray(officers, dtype=np.int64)
+    vehicles = np.asarray(vehicles, dtype=np.int64)
+    risk_weight = np.asarray(risk_weight, dtype=np.float64)
+    coverage = np.asarray(coverage, dtype=np.float64)
+
+    recommended_officers = _apportion(officers, risk_weight, coverage_floor(officers, coverage, min_coverage))
+    recommended_vehicles = _apportion(
+        vehicles, recommended_officers.astype(np.float64), np.ones_like(vehicles)
+    )
+    return recommended_officers, recommended_vehicles
+
+def project_impact(
+    current_officers: np.ndarray,
+    recommended_officers: np.ndarray,
+    coverage: np.ndarray,
+    response_time: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Projected coverage (%, capped at 100) and response time (min) under a new officer count
+
+    Uses the same model as coverage_floor: coverage scales with officers, response time
+    scales inversely with them.
+    """
+    ratio = np.asarray(recommended_officers, dtype=np.float64) / np.asarray(current_officers, dtype=np.float64)
+    return np.minimum(coverage * ratio, 100.0), response_time / ratio
@@ -1,34 +1,469 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-from uuid import UUID
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+import hashlib
+import math
+import random
+from collections import defaultdict
+from functools import lru_cache
 import json
-import pandas as pd
-from collections import Counter
-from sklearn.cluster import DBSCAN
+import orjson
 import numpy as np
+from pydantic import BaseModel, Field, ValidationError
 
-from core.rag.llm import llm
-from core.rag.incidents_vectorstore import get_similar_incidents
-from apps.incidents.services import IncidentService
-from sqlmodel import Session, select
+from core.database import json_contains
+from core.rag.llm import llm, llm_flash
+from core.rag.llm_cache import cached_llm_run, insights_cache, prediction_cache, prediction_result_cache
+from sqlmodel import Session, func, select
 from apps.incidents.models import Incident
 
 logger = logging.getLogger(__name__)
 
-# Custom JSON encoder to handle UUID serialization
-class UUIDEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, UUID):
-            # Convert UUID to string
-            return str(obj)
-        if isinstance(obj, datetime):
-            # Convert datetime to ISO format string
-            return obj.isoformat()
-        # Let the base class default method handle other types
-        return super().default(obj)
+# Period keys for crime statistics; the PostgreSQL formats produce identical strings
+_PERIOD_FORMATS = {"month": "%Y-%m", "day": "%Y-%m-%d", "week": "%G-W%V"}
+_PG_PERIOD_FORMATS = {"month": "YYYY-MM", "day": "YYYY-MM-DD", "week": 'IYYY-"W"IW'}
+
+# Period labels for trend analysis intervals (applied to each period start)
+_TREND_PERIOD_FORMATS = {"daily": "%Y-%m-%d", "weekly": "%G-W%V", "monthly": "%Y-%m"}
+
+# Incident columns the predictive prompt needs (location carries district and coordinates)
+_PREDICTION_COLUMNS = (
+    Incident.id, Incident.title, Incident.description, Incident.type,
+    Incident.date, Incident.location, Incident.severity, Incident.status
+)
+
+# Smallest group of incidents reported as a hotspot
+_HOTSPOT_MIN_CLUSTER_SIZE = 3
+
+# Hotspots closer than this many meters are merged, per heatmap resolution
+_HOTSPOT_MERGE_METERS = {"high": 100, "medium": 500, "low": 1000}
+_EARTH_RADIUS_METERS = 6_371_000
+
+# Below these sizes there is nothing for the LLM to interpret, so the call is skipped
+_MIN_TREND_PERIODS = 3
+_MIN_TIME_PATTERN_INCIDENTS = 10
+
+# Heatmap weight per severity; unknown severities take the last entry
+_SEVERITY_INDEX = {"low": 0, "moderate": 1, "high": 2, "critical": 3}
+_SEVERITY_WEIGHTS = np.array([0.3, 0.6, 0.8, 1.0, 0.5])
+
+# Time slot labels used by analyze_time_patterns
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+
+# Prompts are split into a constant system prefix and a small per-request body so the
+# identical instruction tokens can be served from the provider's prompt prefix cache.
+# Within the body the bulky data block comes first and the short parameters last, so
+# requests over the same data differ only at the tail
+PREDICTION_SYSTEM_INSTRUCTIONS = """You are an advanced crime prediction AI. Based on the historical crime incident data provided,
+generate predictions for potential future crime incidents within the requested forecast horizon.
+
+Instructions:
+1. Analyze patterns in the historical data
+2. Consider time-based patterns, location-based patterns, crime types, and severity
+3. Generate predictions covering the requested forecast horizon
+4. Only include predictions with confidence level at or above the requested minimum confidence
+5. If a specific crime type or district focus is given, focus on that
+6. For each prediction, provide realistic coordinates matching the districts in the historical data
+7. Ensure the probability values are between 0.0 and 1.0
+8. Use specific time ranges in the timeframe that reflect typical crime patterns
+9. List 2-4 specific factors that led to each prediction
+10. Include 3-5 specific recommendations for law enforcement action
+
+Return your analysis as a valid JSON object with the following structure:
+```
+{{
+    "predictions": [
+        {{
+            "coordinates": [longitude, latitude],
+            "probability": 0.XX (a value between 0-1),
+            "crimeType": "type of crime predicted",
+            "timeframe": {{
+                "start": "ISO datetime",
+                "end": "ISO datetime"
+            }},
+            "factors": ["factor1", "factor2", "factor3"]
+        }},
+        ... more predictions ...
+    ],
+    "recommendations": [
+        {{
+            "district": "district name",
+            "action": "recommended action"
+        }},
+        ... more recommendations ...
+    ]
+}}
+```
+
+Ensure the output is properly formatted JSON, so it can be parsed programmatically."""
+
+PREDICTION_USER_TEMPLATE = """Historical incident data:
+{incidents_data}
+
+Forecast horizon: next {days_ahead} days
+Minimum confidence: {confidence_threshold}%
+Crime type focus: {crime_type}
+District focus: {district}"""
+
+STATISTICS_INSIGHTS_SYSTEM_INSTRUCTIONS = """You are an expert crime analyst. Based on the crime statistics provided, generate insightful observations and recommendations.
+
+Provide a comprehensive analysis with the following components in JSON format:
+1. Key findings (3-5 bullet points)
+2. Patterns (2-3 emerging or declining patterns)
+3. Hotspots (1-3 areas with highest crime concentration, if district data is available)
+4. Recommendations (3-5 actionable items for law enforcement)
+
+Return your analysis as a valid JSON object with this structure:
+```
+{{
+    "keyFindings": [
+        "Finding 1",
+        "Finding 2",
+        ...more findings...
+    ],
+    "patterns": [
+        "Pattern 1",
+        "Pattern 2",
+        ...more patterns...
+    ],
+    "hotspots": [
+        {{
+            "district": "District name",
+            "count": 0
+        }},
+        ...more hotspots...
+    ],
+    "recommendations": [
+        "Recommendation 1",
+        "Recommendation 2",
+        ...more recommendations...
+    ]
+}}
+```
+
+Ensure your analysis is data-driven and provides actionable insights."""
+
+STATISTICS_INSIGHTS_USER_TEMPLATE = """Crime incident sample:
+{incidents_data}
+
+Statistics (grouped by {group_by}):
+{statistics}
+
+Trends:
+{trends}
+
+Filters:
+- District: {district}
+- Crime Type: {crime_type}"""
+
+TIME_INSIGHTS_SYSTEM_INSTRUCTIONS = """You are a crime time pattern analyst. Based on the provided crime data grouped by a time factor, analyze temporal patterns and provide insights.
+
+Analyze these patterns and provide a comprehensive analysis including:
+1. Key patterns in crime distribution across the time factor
+2. Possible explanations for peak times
+3. Explanations for anomalies
+4. Actionable recommendations for scheduling police resources
+5. Potential causative factors for observed patterns
+
+Return your analysis as a valid JSON object with this structure:
+```
+{{
+    "keyPatterns": [
+        {{
+            "pattern": "Pattern description",
+            "significance": "High/Medium/Low",
+            "explanation": "Why this pattern occurs"
+        }},
+        ...more patterns...
+    ],
+    "peakTimeAnalysis": "Detailed explanation of peak time findings",
+    "anomalyExplanations": [
+        {{
+            "timeValue": "Specific time value",
+            "explanation": "Why this anomaly might occur"
+        }},
+        ...more explanations...
+    ],
+    "resourceRecommendations": [
+        {{
+            "timeFrame": "Specific time period",
+            "recommendation": "Resource allocation recommendation",
+            "priority": "High/Medium/Low"
+        }},
+        ...more recommendations...
+    ],
+    "causativeFactors": [
+        "Factor 1",
+        "Factor 2",
+        ...more factors...
+    ]
+}}
+```
+
+Ensure your analysis is data-driven and provides actionable insights."""
+
+TIME_INSIGHTS_USER_TEMPLATE = """Sample incidents:
+{incidents}
+
+Time factor: {time_factor}
+
+Time patterns:
+{patterns}
+
+Peak time period:
+{peak_time}
+
+Anomalies detected:
+{anomalies}
+
+Filters:
+- District: {district}
+- Crime Type: {crime_type}"""
+
+HOTSPOT_SYSTEM_INSTRUCTIONS = """You are a crime hotspot analysis specialist. Based on the crime clusters and incident data provided,
+analyze the hotspots and generate insights.
+
+Analyze these hotspots and provide the following in JSON format:
+1. Hotspot patterns (2-4 patterns observed in these hotspots)
+2. Contributing factors for these hotspots
+3. Recommendations for targeted intervention
+
+Return your analysis as a valid JSON object with this structure:
+```
+{{
+    "hotspotPatterns": [
+        {{
+            "name": "Pattern name",
+            "description": "Pattern description",
+            "affectedAreas": ["area1", "area2"]
+        }},
+        ...
+    ],
+    "contributingFactors": [
+        {{
+            "factor": "Factor name",
+            "description": "Why this contributes to hotspots"
+        }},
+        ...
+    ],
+    "recommendations": [
+        {{
+            "action": "Recommended action",
+            "targetedAt": "Specific hotspot or general",
+            "priority": "High/Medium/Low"
+        }},
+        ...
+    ]
+}}
+```
+
+Ensure your analysis is specific, data-driven, and actionable."""
+
+HOTSPOT_USER_TEMPLATE = """Clusters (crime hotspots):
+{clusters}
+
+Sample incidents:
+{incidents}
+
+Filters:
+- District: {district}
+- Crime Type: {crime_type}"""
+
+EMERGING_PATTERNS_SYSTEM_INSTRUCTIONS = """You are an expert crime analyst specializing in trend identification. Based on the crime data provided,
+identify emerging patterns and trends.
+
+Identify 3-5 notable patterns in this data, including emerging trends, periodic patterns, or concerning developments.
+For each pattern, provide:
+1. A short descriptive name
+2. A detailed explanation of the pattern
+3. Supporting evidence from the data
+4. The confidence level (as a percentage)
+5. Potential causes
+
+Return your analysis as a valid JSON array with this structure:
+```
+[
+    {{
+        "name": "Pattern name",
+        "description": "Detailed explanation of the pattern",
+        "evidence": "Supporting evidence from the data",
+        "confidence": 0-100,
+        "causes": ["Cause 1", "Cause 2"]
+    }},
+    ...more patterns...
+]
+```
+
+Ensure your analysis is data-driven and provides actionable insights."""
+
+EMERGING_PATTERNS_USER_TEMPLATE = """Crime trends data (grouped by {interval}):
+{trends}
+
+Sample incidents:
+{incidents}
+
+Analysis period: {start_date} to {end_date}
+Filters:
+- District: {district}
+- Crime Type: {crime_type}"""
+
+INCIDENT_SUMMARY_TEMPLATE = """Summarize each crime incident below as a single bullet line in the form
+"- <ISO date and time> | <district> | <longitude>,<latitude> | <type> | <severity> | <key detail>".
+Copy the longitude and latitude from the incident's location.coordinates ([longitude, latitude]) rounded
+to 4 decimal places, or write "unknown" when they are missing.
+Output only the bullet lines, one per incident, with no other text.
+
+Incidents:
+{incidents}"""
+
+# Incidents per map-step summary in predictive analysis
+_SUMMARY_BATCH_SIZE = 10
+
+def _json_model(model, max_output_tokens: int):
+    """Bind Gemini's JSON output mode, an output token cap and a low temperature to a chat model"""
+    return model.bind(generation_config={
+        "response_mime_type": "application/json",
+        "max_output_tokens": max_output_tokens,
+        # Sampling heat buys nothing for structured output and risks malformed JSON
+        "temperature": min(model.temperature, 0.3)
+    })
+
+# Prompts and chains are built once at import; the chat model itself holds no per-request state.
+# Analytics chains answer in JSON mode with output capped per prompt, which bounds decode time
+PREDICTION_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", PREDICTION_SYSTEM_INSTRUCTIONS),
+    ("human", PREDICTION_USER_TEMPLATE)
+]) | _json_model(llm, 2048) | StrOutputParser()
+STATISTICS_INSIGHTS_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", STATISTICS_INSIGHTS_SYSTEM_INSTRUCTIONS),
+    ("human", STATISTICS_INSIGHTS_USER_TEMPLATE)
+]) | _json_model(llm, 1024) | StrOutputParser()
+TIME_INSIGHTS_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", TIME_INSIGHTS_SYSTEM_INSTRUCTIONS),
+    ("human", TIME_INSIGHTS_USER_TEMPLATE)
+]) | _json_model(llm_flash, 1024) | StrOutputParser()
+INCIDENT_SUMMARY_CHAIN = PromptTemplate.from_template(INCIDENT_SUMMARY_TEMPLATE) | llm_flash | StrOutputParser()
+HOTSPOT_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", HOTSPOT_SYSTEM_INSTRUCTIONS),
+    ("human", HOTSPOT_USER_TEMPLATE)
+]) | _json_model(llm_flash, 800) | StrOutputParser()
+EMERGING_PATTERNS_CHAIN = ChatPromptTemplate.from_messages([
+    ("system", EMERGING_PATTERNS_SYSTEM_INSTRUCTIONS),
+    ("human", EMERGING_PATTERNS_USER_TEMPLATE)
+]) | _json_model(llm, 1500) | StrOutputParser()
+
+# orjson handles UUID and datetime natively; numpy scalars/arrays come from the vectorized stats
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _dumps(obj: Any) -> str:
+    """Serialize prompt data to a JSON string, stringifying any other unknown types"""
+    return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+
+def _format_incidents_compact(incidents: List[Incident]) -> List[Dict[str, Any]]:
+    """Format incidents for prompts with only the fields the analyses reason about"""
+    return [
+        {
+            "id": str(incident.id),
+            "type": incident.type,
+            "date": incident.date.strftime("%Y-%m-%d %H:%M"),
+            "severity": incident.severity,
+            "district": (incident.location or {}).get("district", "unknown")
+        }
+        for incident in incidents
+    ]
+
+def _sample_by_stratum(incidents: List[Incident], k: int) -> List[Incident]:
+    """Pick min(k, len(incidents)) incidents with each (district, type) stratum represented in proportion
+
+    Every stratum gets one slot and the remaining slots are split in proportion to stratum size
+    (floor plus largest remainder), so quotas sum to exactly k. When there are more strata than
+    k, only the k largest strata are represented, with one incident each. The sampler is seeded,
+    so the same incidents give the same sample and prompt caches still hit.
+    """
+    if len(incidents) <= k:
+        return list(incidents)
+    
+    strata = defaultdict(list)
+    for incident in incidents:
+        strata[((incident.location or {}).get("district"), incident.type)].append(incident)
+    groups = sorted(strata.values(), key=len, reverse=True)[:k]
+    
+    # One slot per stratum, then the rest by size beyond that slot; no quota exceeds its stratum
+    spare = k - len(groups)
+    extra = len(incidents) - len(groups)
+    shares = [spare * (len(members) - 1) / extra for members in groups] if extra else [0.0] * len(groups)
+    quotas = [1 + math.floor(share) for share in shares]
+    by_remainder = sorted(range(len(groups)), key=lambda i: shares[i] - math.floor(shares[i]), reverse=True)
+    for i in by_remainder[:k - sum(quotas)]:
+        quotas[i] += 1
+    
+    rng = random.Random(0)
+    sample = []
+    for members, quota in zip(groups, quotas):
+        sample.extend(rng.sample(members, quota))
+    
+    return sample
+
+# Token budgets for the data blocks embedded in a single prompt
+_INCIDENT_TOKEN_BUDGET = 2000
+_CLUSTER_TOKEN_BUDGET = 4000
+_TREND_TOKEN_BUDGET = 4000
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """Load the tokenizer on first use; o200k is a close proxy for Gemini's own tokenizer"""
+    import tiktoken
+    return tiktoken.get_encoding("o200k_base")
+
+def _pack_by_tokens(items: List[Any], budget: int = _INCIDENT_TOKEN_BUDGET) -> List[Any]:
+    """Return the longest prefix of items whose serialized JSON fits within budget tokens"""
+    encoder = _token_encoder()
+    packed, used = [], 0
+    for item in items:
+        tokens = len(encoder.encode(_dumps(item)))
+        if used + tokens > budget:
+            break
+        packed.append(item)
+        used += tokens
+    
+    return packed
+
+def _payload_digest(obj: Any) -> str:
+    """Content address of a prompt payload, used to key caches without the payload itself"""
+    return hashlib.sha256(orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)).hexdigest()
+
+# Reused decoder; raw_decode parses from an offset and stops at the end of the value
+_JSON_DECODER = json.JSONDecoder()
+
+def _parse_llm_json(response: str, opener: str = "{") -> Any:
+    """Parse the first JSON object (or array, with opener="[") embedded in an LLM response"""
+    start = response.find(opener)
+    value, _ = _JSON_DECODER.raw_decode(response, max(start, 0))
+    return value
+
+def _coordinate_pair(location: Optional[Dict[str, Any]]) -> Any:
+    """Return an incident's [lng, lat] pair, or a NaN pair when it is missing or malformed"""
+    coords = location.get("coordinates") if location else None
+    return coords if coords and len(coords) == 2 else (np.nan, np.nan)
+
+class PredictionItem(BaseModel):
+    """One predicted incident as returned by the prediction prompt"""
+    coordinates: Tuple[float, float]
+    probability: float = Field(ge=0.0, le=1.0)
+    crimeType: str
+    timeframe: Dict[str, str]
+    factors: List[str] = Field(default_factory=list)
+
+class PredictionResponse(BaseModel):
+    """Validated prediction payload; missing lists default to empty"""
+    predictions: List[PredictionItem] = Field(default_factory=list)
+    recommendations: List[Dict[str, str]] = Field(default_factory=list)
 
 class AnalyticsService:
     
@@ -43,15 +478,38 @@ class AnalyticsService:
         """Generate predictive crime analysis using LLM and RAG"""
         
         try:
-            # 1. Fetch recent incidents data
-            query = select(Incident).order_by(Incident.date.desc()).limit(100)
-            
             # Apply filters if provided
+            filters = []
             if crime_type:
-                query = query.where(Incident.type == crime_type)
+                filters.append(Incident.type == crime_type)
             if district:
-                query = query.where(Incident.location["district"].as_string() == district)
-                
+                filters.append(json_contains(Incident.location, {"district": district}))
+            
+            # 0. Fingerprint the matching data with one aggregate; unchanged data + params
+            # returns the previous result without loading rows or calling the LLM
+            last_updated, incident_count = session.exec(
+                select(func.max(Incident.updated_at), func.count()).select_from(Incident).where(*filters)
+            ).one()
+            fingerprint = prediction_result_cache.make_key(
+                "prediction_result",
+                last_updated=last_updated,
+                incident_count=incident_count,
+                crime_type=crime_type,
+                district=district,
+                days_ahead=days_ahead,
+                confidence_threshold=confidence_threshold
+            )
+            cached_result = prediction_result_cache.get(fingerprint)
+            if cached_result is not None:
+                return cached_result
+            
+            # 1. Fetch recent incidents data; only the columns the prompt uses, as plain rows
+            query = (
+                select(*_PREDICTION_COLUMNS)
+                .where(*filters)
+                .order_by(Incident.date.desc())
+                .limit(100)
+            )
             incidents = session.exec(query).all()
             
             if not incidents:
@@ -62,97 +520,34 @@ class AnalyticsService:
                     "predictions": []
                 }
             
-            # 2. Prepare input data for LLM
-            incidents_data = []
-            for incident in incidents:
-                incident_dict = IncidentService._format_incident(incident)
-                incidents_data.append(incident_dict)
+            # 2. Prepare input data for LLM; orjson serializes the row values directly
+            incidents_data = [row._asdict() for row in incidents]
             
-            # 3. Create a prompt template for the prediction task
-            prediction_prompt = PromptTemplate(
-                input_variables=["incidents_data", "days_ahead", "crime_type", "district", "confidence_threshold"],
-                template="""
-                You are an advanced crime prediction AI. Based on the historical crime incident data provided, 
-                generate predictions for potential future crime incidents in the next {days_ahead} days.
-                
-                Historical incident data:
-                {incidents_data}
-                
-                Instructions:
-                1. Analyze patterns in the historical data
-                2. Consider time-based patterns, location-based patterns, crime types, and severity
-                3. Generate predictions for the next {days_ahead} days
-                4. Only include predictions with confidence level at or above {confidence_threshold}%
-                5. If a specific crime type "{crime_type}" or district "{district}" is specified, focus on that
-                6. For each prediction, provide realistic coordinates matching the districts in the historical data
-                7. Ensure the probability values are between 0.0 and 1.0
-                8. Use specific time ranges in the timeframe that reflect typical crime patterns
-                9. List 2-4 specific factors that led to each prediction
-                10. Include 3-5 specific recommendations for law enforcement action
-                
-                Return your analysis as a valid JSON object with the following structure:
-                ```
-                {{
-                    "predictions": [
-                        {{
-                            "coordinates": [longitude, latitude],
-                            "probability": 0.XX (a value between 0-1),
-                            "crimeType": "type of crime predicted",
-                            "timeframe": {{
-                                "start": "ISO datetime",
-                                "end": "ISO datetime"
-                            }},
-                            "factors": ["factor1", "factor2", "factor3"]
-                        }},
-                        ... more predictions ...
-                    ],
-                    "recommendations": [
-                        {{
-                            "district": "district name",
-                            "action": "recommended action"
-                        }},
-                        ... more recommendations ...
-                    ]
-                }}
-                ```
-                
-                Ensure the output is properly formatted JSON, so it can be parsed programmatically.
-                """
-            )
-            
-            # 4. Use LLMChain
-            chain = LLMChain(llm=llm, prompt=prediction_prompt)
-            
-            # Filter parameters for prompt
+            # 3. Filter parameters for prompt
             crime_type_param = crime_type if crime_type else "any"
             district_param = district if district else "all districts"
             
-            # Serialize with custom encoder to handle UUID and datetime objects
-            incidents_json = json.dumps(
-                incidents_data[:20],  # Limit to avoid token limits
-                cls=UUIDEncoder
-            )
+            # 4. Execute the shared chain. The response cache is keyed on a digest of the raw
+            # incidents plus the parameters, so a hit also skips the summarization step
+            prompt_params = {
+                "days_ahead": days_ahead,
+                "crime_type": crime_type_param,
+                "district": district_param,
+                "confidence_threshold": confidence_threshold
+            }
+            cache_vars = {"incidents_digest": _payload_digest(incidents_data), **prompt_params}
             
-            # Execute the chain
-            response = chain.run(
-                incidents_data=incidents_json,
-                days_ahead=days_ahead,
-                crime_type=crime_type_param,
-                district=district_param,
-                confidence_threshold=confidence_threshold
-            )
+            def run_prediction() -> str:
+                summary = AnalyticsService._summarize_incidents(incidents_data)
+                return PREDICTION_CHAIN.invoke({"incidents_data": summary, **prompt_params})
+            
+            response = cached_llm_run(prediction_cache, "prediction", cache_vars, run_prediction)
             
             # 5. Parse and format the response
             try:
-                # Extract the JSON part from the response
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    predictions_data = json.loads(json_str)
-                else:
-                    # If no JSON found, attempt to parse the entire response
-                    predictions_data = json.loads(response)
+                # Decode the first JSON value in the response, ignoring any surrounding prose,
+                # then validate its shape in one pass (absent lists default to empty)
+                parsed = PredictionResponse.model_validate(_parse_llm_json(response))
 
                 # 6. Structure the final response
                 result = {
@@ -160,23 +555,13 @@ class AnalyticsService:
                     "daysAhead": days_ahead,
                     "modelVersion": "v2.3.1",  # Placeholder version info
                     "modelAccuracy": 87,       # Placeholder accuracy
+                    **parsed.model_dump(mode="json")
                 }
                 
-                # Add predictions if present
-                if "predictions" in predictions_data:
-                    result["predictions"] = predictions_data["predictions"]
-                else:
-                    result["predictions"] = []
-                
-                # Add recommendations if present
-                if "recommendations" in predictions_data:
-                    result["recommendations"] = predictions_data["recommendations"]
-                else:
-                    result["recommendations"] = []
-                    
+                prediction_result_cache.set(fingerprint, result)
                 return result
                 
-            except json.JSONDecodeError as e:
+            except (json.JSONDecodeError, ValidationError) as e:
                 logger.error(f"Failed to parse LLM response as JSON: {e}")
                 logger.debug(f"Response was: {response}")
                 
@@ -194,6 +579,24 @@ class AnalyticsService:
             logger.error(traceback.format_exc())
             raise ValueError(f"Prediction generation failed: {str(e)}")
     
+    @staticmethod
+    def _summarize_incidents(incidents_data: List[Dict[str, Any]]) -> str:
+        """Map-reduce the incidents into compact bullets so every fetched incident fits the prompt"""
+        batches = [
+            {"incidents": _dumps(incidents_data[i:i + _SUMMARY_BATCH_SIZE])}
+            for i in range(0, len(incidents_data), _SUMMARY_BATCH_SIZE)
+        ]
+        
+        try:
+            # Map: summarize the batches concurrently on the cheaper model
+            summaries = INCIDENT_SUMMARY_CHAIN.batch(batches, config={"max_concurrency": len(batches)})
+        except Exception as e:
+            logger.warning("Incident summarization failed, sending a raw sample instead: %s", e)
+            return _dumps(_pack_by_tokens(incidents_data))
+        
+        # Reduce: the bullet lists are concatenated in their original (newest first) order
+        return "\n".join(summary.strip() for summary in summaries)
+    
     @staticmethod
     def generate_crime_statistics(
         incidents: List[Incident],
@@ -206,182 +609,232 @@ class AnalyticsService:
         """Generate crime statistics with AI-enhanced insights"""
         try:
             # Group incidents by the specified dimension
-            grouped_stats = {}
-            
-            # Extract basic statistics first
-            if group_by == "month":
-                # Group by month
-                for incident in incidents:
-                    month_key = incident.date.strftime('%Y-%m')
-                    if month_key not in grouped_stats:
-                        grouped_stats[month_key] = {"count": 0, "breakdown": {}}
-                    
-                    grouped_stats[month_key]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_stats[month_key]["breakdown"]:
-                        grouped_stats[month_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_stats[month_key]["breakdown"][incident_type] += 1
-            
-            elif group_by == "day":
-                # Group by day
-                for incident in incidents:
-                    day_key = incident.date.strftime('%Y-%m-%d')
-                    if day_key not in grouped_stats:
-                        grouped_stats[day_key] = {"count": 0, "breakdown": {}}
-                    
-                    grouped_stats[day_key]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_stats[day_key]["breakdown"]:
-                        grouped_stats[day_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_stats[day_key]["breakdown"][incident_type] += 1
-            
-            elif group_by == "week":
-                # Group by week
-                for incident in incidents:
-                    week_key = f"{incident.date.strftime('%Y')}-W{incident.date.isocalendar()[1]}"
-                    if week_key not in grouped_stats:
-                        grouped_stats[week_key] = {"count": 0, "breakdown": {}}
-                    
-                    grouped_stats[week_key]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_stats[week_key]["breakdown"]:
-                        grouped_stats[week_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_stats[week_key]["breakdown"][incident_type] += 1
-            
-            elif group_by == "type":
-                # Group by crime type
-                for incident in incidents:
-                    type_key = incident.type
-                    if type_key not in grouped_stats:
-                        grouped_stats[type_key] = {"count": 0, "districts": {}}
-                    
-                    grouped_stats[type_key]["count"] += 1
-                    
-                    # Track breakdown by district
-                    district_val = incident.location.get("district", "unknown")
-                    if district_val not in grouped_stats[type_key]["districts"]:
-                        grouped_stats[type_key]["districts"][district_val] = 0
-                    
-                    grouped_stats[type_key]["districts"][district_val] += 1
-            
-            elif group_by == "district":
-                # Group by district
-                for incident in incidents:
-                    district_key = incident.location.get("district", "unknown")
-                    if district_key not in grouped_stats:
-                        grouped_stats[district_key] = {"count": 0, "breakdown": {}}
-                    
-                    grouped_stats[district_key]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_stats[district_key]["breakdown"]:
-                        grouped_stats[district_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_stats[district_key]["breakdown"][incident_type] += 1
+            grouped_stats = AnalyticsService._group_incident_counts(
+                [incident.date for incident in incidents],
+                [incident.type for incident in incidents],
+                [incident.location.get("district", "unknown") for incident in incidents],
+                group_by
+            )
             
-            # Format statistics for output
-            statistics = []
-            for key, stats in grouped_stats.items():
-                if group_by == "type":
-                    stat_item = {
-                        "type": key,
-                        "count": stats["count"],
-                        "districts": stats["districts"]
-                    }
-                elif group_by == "district":
-                    stat_item = {
-                        "district": key,
-                        "count": stats["count"],
-                        "breakdown": stats["breakdown"]
-                    }
-                else:
-                    stat_item = {
-                        "period": key,
-                        "count": stats["count"],
-                        "breakdown": stats["breakdown"]
-                    }
-                statistics.append(stat_item)
+            return AnalyticsService._build_statistics_result(
+                grouped_stats, len(incidents), incidents,
+                start_date, end_date, group_by, district, crime_type
+            )
             
-            # Sort statistics by period or count
-            if group_by in ["month", "day", "week"]:
-                statistics.sort(key=lambda x: x["period"])
-            else:
-                statistics.sort(key=lambda x: x["count"], reverse=True)
+        except Exception as e:
+            logger.error(f"Error generating crime statistics: {str(e)}")
+            import traceback
+            logger.error(traceback.format_exc())
+            raise ValueError(f"Statistics generation failed: {str(e)}")
+    
+    @staticmethod
+    def generate_crime_statistics_sql(
+        session: Session,
+        start_date: datetime,
+        end_date: datetime,
+        group_by: str,
+        district: Optional[str] = None,
+        crime_type: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Generate crime statistics with counts aggregated in the database
+
+        Returns None when no incidents match, so the caller can answer without the LLM.
+        """
+        try:
+            filters = [Incident.date >= start_date, Incident.date <= end_date]
+            if district:
+                filters.append(json_contains(Incident.location, {"district": district}))
+            if crime_type:
+                filters.append(Incident.type == crime_type)
             
-            # Calculate trends if we have time-based data
-            trends = {"overall": "0%", "byType": {}}
-            if len(statistics) >= 2 and group_by in ["month", "day", "week"]:
-                try:
-                    # Calculate overall trend
-                    first_count = statistics[0]["count"] if statistics[0]["count"] > 0 else 1
-                    last_count = statistics[-1]["count"]
-                    percent_change = ((last_count - first_count) / first_count) * 100
-                    trends["overall"] = f"{'+' if percent_change >= 0 else ''}{percent_change:.1f}%"
-                    
-                    # Calculate trends by type
-                    crime_types = set()
-                    for stat in statistics:
-                        crime_types.update(stat["breakdown"].keys())
-                    
-                    for crime_type in crime_types:
-                        first_type_count = statistics[0]["breakdown"].get(crime_type, 0)
-                        last_type_count = statistics[-1]["breakdown"].get(crime_type, 0)
-                        
-                        if first_type_count > 0:
-                            type_change = ((last_type_count - first_type_count) / first_type_count) * 100
-                            trends["byType"][crime_type] = f"{'+' if type_change >= 0 else ''}{type_change:.1f}%"
-                        else:
-                            trends["byType"][crime_type] = "N/A"
-                except Exception as e:
-                    logger.error(f"Error calculating trends: {e}")
+            grouped_stats = AnalyticsService._aggregate_incident_counts(session, filters, group_by)
+            total_incidents = sum(stats["count"] for stats in grouped_stats.values())
+            if not total_incidents:
+                return None
             
-            # Prepare data for LLM insights
-            incidents_data = []
-            for incident in incidents[:50]:  # Limit to 50 incidents for the LLM
-                incident_dict = IncidentService._format_incident(incident)
-                incidents_data.append(incident_dict)
+            # Only the LLM sample needs full incident rows
+            sample_incidents = session.exec(select(Incident).where(*filters).limit(500)).all()
             
-            # Use LLM to generate insights
-            insights = AnalyticsService._generate_statistics_insights(
-                incidents_data=incidents_data,
-                statistics=statistics,
-                trends=trends,
-                group_by=group_by,
-                district=district,
-                crime_type=crime_type
+            return AnalyticsService._build_statistics_result(
+                grouped_stats, total_incidents, sample_incidents,
+                start_date, end_date, group_by, district, crime_type
             )
             
-            # Build the complete response
-            result = {
-                "timeframe": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat()
-                },
-                "totalIncidents": len(incidents),
-                "groupedBy": group_by,
-                "statistics": statistics,
-                "trends": trends,
-                "insights": insights
-            }
-            
-            return result
-            
         except Exception as e:
-            logger.error(f"Error generating crime statistics: {str(e)}")
+            logger.error("Error generating crime statistics: %s", e)
             import traceback
             logger.error(traceback.format_exc())
             raise ValueError(f"Statistics generation failed: {str(e)}")
     
+    @staticmethod
+    def _aggregate_incident_counts(session: Session, filters: List[Any], group_by: str) -> Dict[str, Dict[str, Any]]:
+        """Count incidents per (group, sub-group) for generate_crime_statistics_sql"""
+        district_expr = func.coalesce(Incident.location["district"].as_string(), "unknown")
+        
+        if session.get_bind().dialect.name != "postgresql":
+            # No portable ISO-week formatting elsewhere; fetch three columns and group in pandas
+            rows = session.exec(select(Incident.date, Incident.type, district_expr).where(*filters)).all()
+            return AnalyticsService._group_incident_counts(
+                [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows], group_by
+            )
+        
+        if group_by in _PG_PERIOD_FORMATS:
+            group_expr, sub_expr = func.to_char(Incident.date, _PG_PERIOD_FORMATS[group_by]), Incident.type
+        elif group_by == "type":
+            group_expr, sub_expr = Incident.type, district_expr
+        elif group_by == "district":
+            group_expr, sub_expr = district_expr, Incident.type
+        else:
+            return {}
+        
+        query = (
+            select(group_expr.label("group_key"), sub_expr.label("sub_key"), func.count().label("n"))
+            .where(*filters)
+            # Group by output labels so to_char's bound format isn't seen as a different expression
+            .group_by("group_key", "sub_key")
+        )
+        return AnalyticsService._grouped_stats_from_counts(session.exec(query).all(), group_by)
+    
+    @staticmethod
+    def _group_incident_counts(
+        dates: List[datetime],
+        types: List[str],
+        districts: List[str],
+        group_by: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Group incident columns by the requested dimension with one pandas groupby"""
+        if not dates or not (group_by in _PERIOD_FORMATS or group_by in ("type", "district")):
+            return {}
+        
+        # pandas is only needed on this path, so keep it out of worker startup
+        import pandas as pd
+        
+        # Build one frame and let pandas hash-aggregate instead of per-incident dict updates
+        df = pd.DataFrame({"date": pd.to_datetime(dates), "type": types, "district": districts})
+        
+        if group_by in _PERIOD_FORMATS:
+            group_key, sub_key = df["date"].dt.strftime(_PERIOD_FORMATS[group_by]), "type"
+        elif group_by == "type":
+            group_key, sub_key = df["type"], "district"
+        else:
+            group_key, sub_key = df["district"], "type"
+        
+        # sort=False keeps first-seen order, matching the previous tie ordering
+        counts = df.groupby([group_key.rename("key"), df[sub_key]], sort=False).size()
+        return AnalyticsService._grouped_stats_from_counts(
+            ((key, sub_value, count) for (key, sub_value), count in counts.items()), group_by
+        )
+    
+    @staticmethod
+    def _grouped_stats_from_counts(rows, group_by: str) -> Dict[str, Dict[str, Any]]:
+        """Fold (group, sub-group, count) rows into the per-group stats structure"""
+        # Type groups break down by district; every other grouping breaks down by type
+        breakdown_field = "districts" if group_by == "type" else "breakdown"
+        
+        grouped_stats = {}
+        for key, sub_value, count in rows:
+            stats = grouped_stats.setdefault(key, {"count": 0, breakdown_field: {}})
+            stats["count"] += int(count)
+            stats[breakdown_field][sub_value] = int(count)
+        
+        return grouped_stats
+    
+    @staticmethod
+    def _build_statistics_result(
+        grouped_stats: Dict[str, Dict[str, Any]],
+        total_incidents: int,
+        sample_incidents: List[Incident],
+        start_date: datetime,
+        end_date: datetime,
+        group_by: str,
+        district: Optional[str],
+        crime_type: Optional[str]
+    ) -> Dict[str, Any]:
+        """Format grouped counts, compute trends and attach LLM insights"""
+        # Format statistics for output
+        statistics = []
+        for key, stats in grouped_stats.items():
+            if group_by == "type":
+                stat_item = {
+                    "type": key,
+                    "count": stats["count"],
+                    "districts": stats["districts"]
+                }
+            elif group_by == "district":
+                stat_item = {
+                    "district": key,
+                    "count": stats["count"],
+                    "breakdown": stats["breakdown"]
+                }
+            else:
+                stat_item = {
+                    "period": key,
+                    "count": stats["count"],
+                    "breakdown": stats["breakdown"]
+                }
+            statistics.append(stat_item)
+        
+        # Sort statistics by period or count
+        if group_by in ["month", "day", "week"]:
+            statistics.sort(key=lambda x: x["period"])
+        else:
+            statistics.sort(key=lambda x: x["count"], reverse=True)
+        
+        # Calculate trends if we have time-based data
+        trends = {"overall": "0%", "byType": {}}
+        if len(statistics) >= 2 and group_by in ["month", "day", "week"]:
+            try:
+                # Calculate overall trend
+                first_count = statistics[0]["count"] if statistics[0]["count"] > 0 else 1
+                last_count = statistics[-1]["count"]
+                percent_change = ((last_count - first_count) / first_count) * 100
+                trends["overall"] = f"{'+' if percent_change >= 0 else ''}{percent_change:.1f}%"
+                
+                # Calculate trends by type
+                crime_types = set()
+                for stat in statistics:
+                    crime_types.update(stat["breakdown"].keys())
+                
+                for type_name in crime_types:
+                    first_type_count = statistics[0]["breakdown"].get(type_name, 0)
+                    last_type_count = statistics[-1]["breakdown"].get(type_name, 0)
+                    
+                    if first_type_count > 0:
+                        type_change = ((last_type_count - first_type_count) / first_type_count) * 100
+                        trends["byType"][type_name] = f"{'+' if type_change >= 0 else ''}{type_change:.1f}%"
+                    else:
+                        trends["byType"][type_name] = "N/A"
+            except Exception as e:
+                logger.error(f"Error calculating trends: {e}")
+        
+        # Prepare data for LLM insights
+        incidents_data = _format_incidents_compact(_sample_by_stratum(sample_incidents, 50))
+        
+        # Use LLM to generate insights
+        insights = AnalyticsService._generate_statistics_insights(
+            incidents_data=incidents_data,
+            statistics=statistics,
+            trends=trends,
+            group_by=group_by,
+            district=district,
+            crime_type=crime_type
+        )
+        
+        # Build the complete response
+        result = {
+            "timeframe": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat()
+            },
+            "totalIncidents": total_incidents,
+            "groupedBy": group_by,
+            "statistics": statistics,
+            "trends": trends,
+            "insights": insights
+        }
+        
+        return result
+    
     @staticmethod
     def _generate_statistics_insights(
         incidents_data: List[Dict[str, Any]],
@@ -394,95 +847,32 @@ class AnalyticsService:
         """Generate insights for crime statistics using LLM"""
         try:
             # Serialize data for LLM
-            incidents_json = json.dumps(
-                incidents_data[:20],  # Limit to avoid token limits
-                cls=UUIDEncoder
-            )
+            incidents_json = _dumps(_pack_by_tokens(incidents_data))  # Fit the token budget
             
-            statistics_json = json.dumps(statistics, cls=UUIDEncoder)
-            trends_json = json.dumps(trends, cls=UUIDEncoder)
-            
-            # Create prompt for insights
-            insights_prompt = PromptTemplate(
-                input_variables=["incidents_data", "statistics", "trends", "group_by", "district", "crime_type"],
-                template="""
-                You are an expert crime analyst. Based on the crime statistics provided, generate insightful observations and recommendations.
-                
-                Crime incident sample:
-                {incidents_data}
-                
-                Statistics (grouped by {group_by}):
-                {statistics}
-                
-                Trends:
-                {trends}
-                
-                Filters:
-                - District: {district}
-                - Crime Type: {crime_type}
-                
-                Provide a comprehensive analysis with the following components in JSON format:
-                1. Key findings (3-5 bullet points)
-                2. Patterns (2-3 emerging or declining patterns)
-                3. Hotspots (1-3 areas with highest crime concentration, if district data is available)
-                4. Recommendations (3-5 actionable items for law enforcement)
-                
-                Return your analysis as a valid JSON object with this structure:
-                ```
-                {{
-                    "keyFindings": [
-                        "Finding 1",
-                        "Finding 2",
-                        ...more findings...
-                    ],
-                    "patterns": [
-                        "Pattern 1",
-                        "Pattern 2",
-                        ...more patterns...
-                    ],
-                    "hotspots": [
-                        {{
-                            "district": "District name",
-                            "count": 0
-                        }},
-                        ...more hotspots...
-                    ],
-                    "recommendations": [
-                        "Recommendation 1",
-                        "Recommendation 2",
-                        ...more recommendations...
-                    ]
-                }}
-                ```
-                
-                Ensure your analysis is data-driven and provides actionable insights.
-                """
-            )
+            statistics_json = _dumps(statistics)
+            trends_json = _dumps(trends)
             
             # Execute LLM chain
-            chain = LLMChain(llm=llm, prompt=insights_prompt)
             
             district_param = district if district else "all districts"
             crime_type_param = crime_type if crime_type else "all crime types"
             
-            response = chain.run(
-                incidents_data=incidents_json,
-                statistics=statistics_json,
-                trends=trends_json,
-                group_by=group_by,
-                district=district_param,
-                crime_type=crime_type_param
+            prompt_vars = {
+                "incidents_data": incidents_json,
+                "statistics": statistics_json,
+                "trends": trends_json,
+                "group_by": group_by,
+                "district": district_param,
+                "crime_type": crime_type_param
+            }
+            response = cached_llm_run(
+                insights_cache, "statistics_insights", prompt_vars, lambda: STATISTICS_INSIGHTS_CHAIN.invoke(prompt_vars)
             )
             
             # Parse LLM response
             try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    insights_data = json.loads(json_str)
-                else:
-                    insights_data = json.loads(response)
+                # Decode the first JSON value in the response, ignoring any surrounding prose
+                insights_data = _parse_llm_json(response)
                 
                 return insights_data
             except json.JSONDecodeError:
@@ -512,124 +902,59 @@ class AnalyticsService:
     ) -> Dict[str, Any]:
         """Analyze crime patterns across different time periods"""
         try:
-            # Count incidents by the specified time factor
-            time_counts = {}
+            # Extract all dates once; calendar fields then come from integer ufuncs
+            dates = np.array([incident.date for incident in incidents], dtype="datetime64[s]")
             
+            # Map each incident to a time slot; every slot is reported even when empty
             if time_factor == "hour_of_day":
-                # Group by hour of day (0-23)
-                for incident in incidents:
-                    hour = incident.date.hour
-                    if hour not in time_counts:
-                        time_counts[hour] = {"count": 0, "types": {}}
-                    
-                    time_counts[hour]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in time_counts[hour]["types"]:
-                        time_counts[hour]["types"][incident_type] = 0
-                    
-                    time_counts[hour]["types"][incident_type] += 1
-                
-                # Format for output
-                patterns = []
-                for hour in range(24):  # Ensure all 24 hours are represented
-                    patterns.append({
-                        "timeValue": hour,
-                        "displayValue": f"{hour:02d}:00",
-                        "count": time_counts.get(hour, {"count": 0, "types": {}})["count"],
-                        "breakdown": time_counts.get(hour, {"count": 0, "types": {}})["types"]
-                    })
-                
+                slot_values = list(range(24))
+                display_values = [f"{hour:02d}:00" for hour in slot_values]
+                slot_idx = dates.astype("datetime64[h]").astype(np.int64) % 24
             elif time_factor == "day_of_week":
-                # Map of day indices to names
-                days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                
-                # Group by day of week (0-6 where 0 is Monday)
-                for incident in incidents:
-                    # Convert to 0-6 (Monday-Sunday)
-                    weekday = incident.date.weekday()
-                    day_name = days[weekday]
-                    
-                    if day_name not in time_counts:
-                        time_counts[day_name] = {"count": 0, "types": {}}
-                    
-                    time_counts[day_name]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in time_counts[day_name]["types"]:
-                        time_counts[day_name]["types"][incident_type] = 0
-                    
-                    time_counts[day_name]["types"][incident_type] += 1
-                
-                # Format for output
-                patterns = []
-                for day in days:  # Ensure all days are represented
-                    patterns.append({
-                        "timeValue": day,
-                        "displayValue": day,
-                        "count": time_counts.get(day, {"count": 0, "types": {}})["count"],
-                        "breakdown": time_counts.get(day, {"count": 0, "types": {}})["types"]
-                    })
-                
+                slot_values = display_values = _WEEKDAY_NAMES
+                # 1970-01-01 was a Thursday, i.e. weekday 3 with Monday as 0
+                slot_idx = (dates.astype("datetime64[D]").astype(np.int64) + 3) % 7
             else:  # month_of_year
-                # Map of month indices to names
-                months = ["January", "February", "March", "April", "May", "June", 
-                         "July", "August", "September", "October", "November", "December"]
-                
-                # Group by month (1-12)
-                for incident in incidents:
-                    month = incident.date.month
-                    month_name = months[month - 1]
-                    
-                    if month_name not in time_counts:
-                        time_counts[month_name] = {"count": 0, "types": {}}
-                    
-                    time_counts[month_name]["count"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in time_counts[month_name]["types"]:
-                        time_counts[month_name]["types"][incident_type] = 0
-                    
-                    time_counts[month_name]["types"][incident_type] += 1
-                
-                # Format for output
-                patterns = []
-                for month in months:  # Ensure all months are represented
-                    patterns.append({
-                        "timeValue": month,
-                        "displayValue": month,
-                        "count": time_counts.get(month, {"count": 0, "types": {}})["count"],
-                        "breakdown": time_counts.get(month, {"count": 0, "types": {}})["types"]
-                    })
+                slot_values = display_values = _MONTH_NAMES
+                slot_idx = dates.astype("datetime64[M]").astype(np.int64) % 12
+            
+            types, type_idx = np.unique(
+                np.array([incident.type for incident in incidents], dtype=str), return_inverse=True
+            )
+            
+            # Count (slot, type) pairs in one vectorized pass
+            counts_by_type = np.zeros((len(slot_values), len(types)), dtype=np.int64)
+            np.add.at(counts_by_type, (slot_idx, type_idx), 1)
+            totals = counts_by_type.sum(axis=1)
+            
+            patterns = []
+            for slot, (time_value, display_value) in enumerate(zip(slot_values, display_values)):
+                row = counts_by_type[slot]
+                patterns.append({
+                    "timeValue": time_value,
+                    "displayValue": display_value,
+                    "count": int(totals[slot]),
+                    "breakdown": {str(types[j]): int(row[j]) for j in np.flatnonzero(row)}
+                })
             
             # Find peak times and patterns
             peak_time = max(patterns, key=lambda x: x["count"]) if patterns else None
             
-            # Calculate the standard deviation to identify unusual patterns
-            counts = [p["count"] for p in patterns]
-            mean_count = sum(counts) / len(counts) if counts else 0
-            variance = sum((c - mean_count) ** 2 for c in counts) / len(counts) if counts else 0
-            std_dev = variance ** 0.5
-            
             # Find anomalies (values more than 1.5 standard deviations from the mean)
+            mean_count = float(totals.mean())
+            std_dev = float(totals.std())
             anomalies = []
-            for pattern in patterns:
-                if abs(pattern["count"] - mean_count) > 1.5 * std_dev:
-                    anomalies.append({
-                        "timeValue": pattern["displayValue"],
-                        "count": pattern["count"],
-                        "deviation": (pattern["count"] - mean_count) / std_dev if std_dev else 0,
-                        "isHigh": pattern["count"] > mean_count
-                    })
+            for slot in np.flatnonzero(np.abs(totals - mean_count) > 1.5 * std_dev):
+                count = int(totals[slot])
+                anomalies.append({
+                    "timeValue": display_values[slot],
+                    "count": count,
+                    "deviation": (count - mean_count) / std_dev if std_dev else 0,
+                    "isHigh": count > mean_count
+                })
             
             # Prepare data for LLM analysis
-            incidents_data = []
-            for incident in incidents[:30]:  # Limit to 30 incidents for the LLM
-                incident_dict = IncidentService._format_incident(incident)
-                incidents_data.append(incident_dict)
+            incidents_data = _format_incidents_compact(_sample_by_stratum(incidents, 30))
             
             # Get LLM insights
             insights = AnalyticsService._analyze_time_pattern_insights(
@@ -671,106 +996,44 @@ class AnalyticsService:
         crime_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate insights on time patterns using LLM"""
+        if sum(pattern["count"] for pattern in patterns) < _MIN_TIME_PATTERN_INCIDENTS:
+            return {
+                "keyPatterns": [],
+                "peakTimeAnalysis": "Insufficient data for time pattern insights",
+                "anomalyExplanations": [],
+                "resourceRecommendations": [],
+                "causativeFactors": []
+            }
+        
         try:
             # Prepare data for prompt
-            patterns_json = json.dumps(patterns, cls=UUIDEncoder)
-            anomalies_json = json.dumps(anomalies, cls=UUIDEncoder)
-            peak_time_json = json.dumps(peak_time, cls=UUIDEncoder) if peak_time else "null"
-            incidents_json = json.dumps(incidents_sample[:15], cls=UUIDEncoder)  # Limit sample size for prompt
-            
-            # Create prompt for time pattern insights
-            time_prompt = PromptTemplate(
-                input_variables=["patterns", "anomalies", "peak_time", "time_factor", "incidents", "district", "crime_type"],
-                template="""
-                You are a crime time pattern analyst. Based on the provided crime data grouped by {time_factor}, analyze temporal patterns and provide insights.
-                
-                Time patterns:
-                {patterns}
-                
-                Peak time period:
-                {peak_time}
-                
-                Anomalies detected:
-                {anomalies}
-                
-                Sample incidents:
-                {incidents}
-                
-                Filters:
-                - District: {district}
-                - Crime Type: {crime_type}
-                
-                Analyze these patterns and provide a comprehensive analysis including:
-                1. Key patterns in crime distribution across {time_factor}
-                2. Possible explanations for peak times
-                3. Explanations for anomalies
-                4. Actionable recommendations for scheduling police resources
-                5. Potential causative factors for observed patterns
-                
-                Return your analysis as a valid JSON object with this structure:
-                ```
-                {{
-                    "keyPatterns": [
-                        {{
-                            "pattern": "Pattern description",
-                            "significance": "High/Medium/Low",
-                            "explanation": "Why this pattern occurs"
-                        }},
-                        ...more patterns...
-                    ],
-                    "peakTimeAnalysis": "Detailed explanation of peak time findings",
-                    "anomalyExplanations": [
-                        {{
-                            "timeValue": "Specific time value",
-                            "explanation": "Why this anomaly might occur"
-                        }},
-                        ...more explanations...
-                    ],
-                    "resourceRecommendations": [
-                        {{
-                            "timeFrame": "Specific time period",
-                            "recommendation": "Resource allocation recommendation",
-                            "priority": "High/Medium/Low"
-                        }},
-                        ...more recommendations...
-                    ],
-                    "causativeFactors": [
-                        "Factor 1",
-                        "Factor 2",
-                        ...more factors...
-                    ]
-                }}
-                ```
-                
-                Ensure your analysis is data-driven and provides actionable insights.
-                """
-            )
+            patterns_json = _dumps(patterns)
+            anomalies_json = _dumps(anomalies)
+            peak_time_json = _dumps(peak_time) if peak_time else "null"
+            incidents_json = _dumps(_pack_by_tokens(incidents_sample))  # Fit the token budget
             
             # Execute LLM chain
-            chain = LLMChain(llm=llm, prompt=time_prompt)
             
             district_param = district if district else "all districts"
             crime_type_param = crime_type if crime_type else "all crime types"
             
-            response = chain.run(
-                patterns=patterns_json,
-                anomalies=anomalies_json,
-                peak_time=peak_time_json,
-                time_factor=time_factor,
-                incidents=incidents_json,
-                district=district_param,
-                crime_type=crime_type_param
+            prompt_vars = {
+                "patterns": patterns_json,
+                "anomalies": anomalies_json,
+                "peak_time": peak_time_json,
+                "time_factor": time_factor,
+                "incidents": incidents_json,
+                "district": district_param,
+                "crime_type": crime_type_param
+            }
+            response = cached_llm_run(
+                insights_cache, "time_pattern_insights", prompt_vars, lambda: TIME_INSIGHTS_CHAIN.invoke(prompt_vars)
             )
             
             # Parse LLM response
             try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    insights_data = json.loads(json_str)
-                else:
-                    insights_data = json.loads(response)
+                # Decode the first JSON value in the response, ignoring any surrounding prose
+                insights_data = _parse_llm_json(response)
                 
                 return insights_data
             except json.JSONDecodeError:
@@ -806,31 +1069,18 @@ class AnalyticsService:
     ) -> Dict[str, Any]:
         """Generate heatmap data with clustering for hotspot detection"""
         try:
-            # Extract coordinates from incidents
-            coordinates = []
-            types = []
-            weights = []
-            
-            for incident in incidents:
-                try:
-                    coords = incident.location.get("coordinates")
-                    if coords and len(coords) == 2:
-                        coordinates.append(coords)
-                        types.append(incident.type)
-                        
-                        # Apply weight based on severity
-                        severity_weights = {
-                            "low": 0.3,
-                            "moderate": 0.6,
-                            "high": 0.8,
-                            "critical": 1.0
-                        }
-                        weight = severity_weights.get(incident.severity.lower(), 0.5)
-                        weights.append(weight)
-                except Exception as e:
-                    logger.warning(f"Skipping incident due to invalid coordinates: {e}")
-            
-            if not coordinates:
+            # Extract coordinates in one pass; missing or malformed pairs become NaN rows.
+            # float64 on purpose: HDBSCAN validates its input as float64, so float32 would only
+            # add an upcast copy before clustering
+            coords_array = np.fromiter(
+                (value for incident in incidents for value in _coordinate_pair(incident.location)),
+                dtype=np.float64,
+                count=2 * len(incidents)
+            ).reshape(-1, 2)
+            valid = ~np.isnan(coords_array).any(axis=1)
+            coords_array = coords_array[valid]
+            
+            if not len(coords_array):
                 return {
                     "resolution": resolution,
                     "district": district or "all",
@@ -840,60 +1090,75 @@ class AnalyticsService:
                     "totalIncidents": len(incidents)
                 }
             
+            # Types and severity weights for the incidents that have coordinates
+            types = np.array([incident.type for incident in incidents], dtype=object)[valid]
+            # Severity strings repeat heavily, so lower-case and look up each distinct value once
+            severities, severity_inverse = np.unique(
+                np.array([incident.severity or "" for incident in incidents], dtype=str)[valid], return_inverse=True
+            )
+            severity_idx = np.array([_SEVERITY_INDEX.get(value.lower(), 4) for value in severities], dtype=np.intp)
+            weights = _SEVERITY_WEIGHTS[severity_idx[severity_inverse]]
+            
             # Format points for heatmap
-            points = []
-            for i, coord in enumerate(coordinates):
-                points.append({
-                    "coordinates": coord,
-                    "weight": weights[i],
-                    "type": types[i],
-                    "count": 1
-                })
+            points = [
+                {"coordinates": coord, "weight": weight, "type": crime, "count": 1}
+                for coord, weight, crime in zip(coords_array.tolist(), weights.tolist(), types.tolist())
+            ]
             
             # Apply clustering for hotspot detection
-            eps_values = {"high": 0.001, "medium": 0.005, "low": 0.01}
-            eps = eps_values.get(resolution, 0.005)
-            
             try:
-                # Convert to numpy array for DBSCAN
-                coords_array = np.array(coordinates)
+                # Coordinates are [lng, lat]; the haversine metric wants [lat, lng] in radians
+                # HDBSCAN adapts to varying density; the resolution only sets the distance (in
+                # radians) under which neighbouring hotspots merge. A BallTree keeps the
+                # neighbourhood queries O(N log N) under the haversine metric
+                if len(coords_array) >= _HOTSPOT_MIN_CLUSTER_SIZE:
+                    # sklearn is loaded lazily; only heatmap requests pay for it
+                    from sklearn.cluster import HDBSCAN
+                    
+                    labels = HDBSCAN(
+                        min_cluster_size=_HOTSPOT_MIN_CLUSTER_SIZE,
+                        min_samples=_HOTSPOT_MIN_CLUSTER_SIZE,
+                        metric="haversine",
+                        algorithm="ball_tree",
+                        cluster_selection_epsilon=_HOTSPOT_MERGE_METERS[resolution] / _EARTH_RADIUS_METERS,
+                        cluster_selection_method="leaf"
+                    ).fit_predict(np.radians(coords_array[:, ::-1]))
+                else:
+                    labels = np.full(len(coords_array), -1)
                 
-                # Apply DBSCAN clustering
-                clustering = DBSCAN(eps=eps, min_samples=3).fit(coords_array)
-                labels = clustering.labels_
+                # Process clusters in one pass over the clustered points (negative labels are noise)
+                clustered = labels >= 0
+                cluster_labels = labels[clustered]
+                cluster_coords = coords_array[clustered]
                 
-                # Process clusters
-                clusters = []
-                cluster_ids = set(labels)
+                # Centers are per-cluster coordinate sums over point counts
+                point_counts = np.bincount(cluster_labels)
+                centers_lng = np.bincount(cluster_labels, weights=cluster_coords[:, 0]) / np.maximum(point_counts, 1)
+                centers_lat = np.bincount(cluster_labels, weights=cluster_coords[:, 1]) / np.maximum(point_counts, 1)
                 
-                for cluster_id in cluster_ids:
-                    if cluster_id == -1:
-                        continue  # Skip noise points
-                    
-                    # Get points in this cluster
-                    cluster_points = coords_array[labels == cluster_id]
-                    cluster_types = [types[i] for i, label in enumerate(labels) if label == cluster_id]
-                    
-                    # Calculate cluster center
-                    center_lat = sum(point[1] for point in cluster_points) / len(cluster_points)
-                    center_lng = sum(point[0] for point in cluster_points) / len(cluster_points)
-                    
-                    # Count crime types in cluster
-                    crime_counts = Counter(cluster_types)
-                    
-                    # Add cluster to results
-                    clusters.append({
+                # Cluster x crime type counts in one scatter-add
+                cluster_type_names, type_idx = np.unique(types[clustered].astype(str), return_inverse=True)
+                type_counts = np.zeros((len(point_counts), len(cluster_type_names)), dtype=np.int64)
+                np.add.at(type_counts, (cluster_labels, type_idx), 1)
+                
+                clusters = [
+                    {
                         "id": int(cluster_id),
-                        "center": [center_lng, center_lat],
-                        "pointCount": len(cluster_points),
-                        "crimeTypes": dict(crime_counts),
+                        "center": [float(centers_lng[cluster_id]), float(centers_lat[cluster_id])],
+                        "pointCount": int(point_counts[cluster_id]),
+                        "crimeTypes": {
+                            str(cluster_type_names[j]): int(type_counts[cluster_id, j])
+                            for j in np.flatnonzero(type_counts[cluster_id])
+                        },
                         "radius": 0.01  # Arbitrary radius for visualization
-                    })
+                    }
+                    for cluster_id in np.flatnonzero(point_counts)
+                ]
                 
                 # Generate cluster insights using LLM
                 hotspot_insights = AnalyticsService._analyze_hotspots(
                     clusters=clusters,
-                    incidents=incidents[:50],  # Limit for token count
+                    incidents=_sample_by_stratum(incidents, 50),
                     district=district,
                     crime_type=crime_type
                 )
@@ -935,92 +1200,43 @@ class AnalyticsService:
         crime_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """Use LLM to analyze hotspots and provide insights"""
+        if not clusters:
+            return {
+                "hotspotPatterns": [],
+                "contributingFactors": [],
+                "recommendations": []
+            }
+        
         try:
             # Prepare data for LLM
-            incidents_data = []
-            for incident in incidents[:20]:  # Limit for token count
-                incident_dict = IncidentService._format_incident(incident)
-                incidents_data.append(incident_dict)
-            
-            clusters_json = json.dumps(clusters, cls=UUIDEncoder)
-            incidents_json = json.dumps(incidents_data, cls=UUIDEncoder)
+            # Keep as many of the sampled incidents as fit the token budget
+            incidents_data = _pack_by_tokens(_format_incidents_compact(incidents))
             
-            # Create prompt for hotspot analysis
-            hotspot_prompt = PromptTemplate(
-                input_variables=["clusters", "incidents", "district", "crime_type"],
-                template="""
-                You are a crime hotspot analysis specialist. Based on the crime clusters and incident data provided,
-                analyze the hotspots and generate insights.
-                
-                Clusters (crime hotspots):
-                {clusters}
-                
-                Sample incidents:
-                {incidents}
-                
-                Filters:
-                - District: {district}
-                - Crime Type: {crime_type}
-                
-                Analyze these hotspots and provide the following in JSON format:
-                1. Hotspot patterns (2-4 patterns observed in these hotspots)
-                2. Contributing factors for these hotspots
-                3. Recommendations for targeted intervention
-                
-                Return your analysis as a valid JSON object with this structure:
-                ```
-                {{
-                    "hotspotPatterns": [
-                        {{
-                            "name": "Pattern name",
-                            "description": "Pattern description",
-                            "affectedAreas": ["area1", "area2"]
-                        }},
-                        ...
-                    ],
-                    "contributingFactors": [
-                        {{
-                            "factor": "Factor name",
-                            "description": "Why this contributes to hotspots"
-                        }},
-                        ...
-                    ],
-                    "recommendations": [
-                        {{
-                            "action": "Recommended action",
-                            "targetedAt": "Specific hotspot or general",
-                            "priority": "High/Medium/Low"
-                        }},
-                        ...
-                    ]
-                }}
-                ```
-                
-                Ensure your analysis is specific, data-driven, and actionable.
-                """
-            )
+            # Largest hotspots first, so a dense map drops only the smallest clusters
+            clusters_json = _dumps(_pack_by_tokens(
+                sorted(clusters, key=lambda cluster: cluster["pointCount"], reverse=True), _CLUSTER_TOKEN_BUDGET
+            ))
+            incidents_json = _dumps(incidents_data)
             
             # Execute LLM chain
-            chain = LLMChain(llm=llm, prompt=hotspot_prompt)
             district_param = district if district else "all districts"
             crime_type_param = crime_type if crime_type else "all crime types"
             
-            response = chain.run(
-                clusters=clusters_json,
-                incidents=incidents_json,
-                district=district_param,
-                crime_type=crime_type_param
+            # Identical clusters and filters reuse the earlier response
+            prompt_vars = {
+                "clusters": clusters_json,
+                "incidents": incidents_json,
+                "district": district_param,
+                "crime_type": crime_type_param
+            }
+            response = cached_llm_run(
+                insights_cache, "hotspot_analysis", prompt_vars, lambda: HOTSPOT_CHAIN.invoke(prompt_vars)
             )
             
             # Parse LLM response
             try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    hotspot_data = json.loads(json_str)
-                else:
-                    hotspot_data = json.loads(response)
+                # Decode the first JSON value in the response, ignoring any surrounding prose
+                hotspot_data = _parse_llm_json(response)
                 
                 return hotspot_data
             except json.JSONDecodeError:
@@ -1050,72 +1266,37 @@ class AnalyticsService:
     ) -> Dict[str, Any]:
         """Generate trend analysis with AI-enhanced pattern detection"""
         try:
-            # Group incidents by interval
-            grouped_trends = {}
-            
+            # Floor every date to the start of its period as integer day/month arrays
+            days = np.array([incident.date for incident in incidents], dtype="datetime64[s]").astype("datetime64[D]")
             if interval == "daily":
-                # Group by day
-                for incident in incidents:
-                    day_key = incident.date.strftime('%Y-%m-%d')
-                    if day_key not in grouped_trends:
-                        grouped_trends[day_key] = {"total": 0, "breakdown": {}}
-                    
-                    grouped_trends[day_key]["total"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_trends[day_key]["breakdown"]:
-                        grouped_trends[day_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_trends[day_key]["breakdown"][incident_type] += 1
-            
+                periods = days
             elif interval == "weekly":
-                # Group by week
-                for incident in incidents:
-                    week_key = f"{incident.date.strftime('%Y')}-W{incident.date.isocalendar()[1]}"
-                    if week_key not in grouped_trends:
-                        grouped_trends[week_key] = {"total": 0, "breakdown": {}}
-                    
-                    grouped_trends[week_key]["total"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_trends[week_key]["breakdown"]:
-                        grouped_trends[week_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_trends[week_key]["breakdown"][incident_type] += 1
-            
-            else:  # monthly
-                # Group by month
-                for incident in incidents:
-                    month_key = incident.date.strftime('%Y-%m')
-                    if month_key not in grouped_trends:
-                        grouped_trends[month_key] = {"total": 0, "breakdown": {}}
-                    
-                    grouped_trends[month_key]["total"] += 1
-                    
-                    # Track breakdown by type
-                    incident_type = incident.type
-                    if incident_type not in grouped_trends[month_key]["breakdown"]:
-                        grouped_trends[month_key]["breakdown"][incident_type] = 0
-                    
-                    grouped_trends[month_key]["breakdown"][incident_type] += 1
+                # 1970-01-01 was a Thursday; step back to the Monday that starts the ISO week
+                periods = days - (days.astype(np.int64) + 3) % 7
+            else:
+                periods = days.astype("datetime64[M]")
             
-            # Format trends for output
-            trends = []
-            for key in sorted(grouped_trends.keys()):
-                trend_item = {
-                    "period": key,
-                    "total": grouped_trends[key]["total"],
-                    "breakdown": grouped_trends[key]["breakdown"]
+            # Period x crime type counts in one scatter-add; np.unique returns periods in order
+            period_values, period_idx = np.unique(periods, return_inverse=True)
+            types, type_idx = np.unique(
+                np.array([incident.type for incident in incidents], dtype=str), return_inverse=True
+            )
+            counts_by_type = np.zeros((len(period_values), len(types)), dtype=np.int64)
+            np.add.at(counts_by_type, (period_idx, type_idx), 1)
+            
+            # Format trends for output; strftime runs once per period, not per incident
+            period_format = _TREND_PERIOD_FORMATS.get(interval, _TREND_PERIOD_FORMATS["monthly"])
+            trends = [
+                {
+                    "period": period.astype(object).strftime(period_format),
+                    "total": int(row.sum()),
+                    "breakdown": {str(types[j]): int(row[j]) for j in np.flatnonzero(row)}
                 }
-                trends.append(trend_item)
+                for period, row in zip(period_values, counts_by_type)
+            ]
             
             # Prepare data for LLM analysis
-            incidents_data = []
-            for incident in incidents[:50]:  # Limit for token count
-                incident_dict = IncidentService._format_incident(incident)
-                incidents_data.append(incident_dict)
+            incidents_data = _format_incidents_compact(_sample_by_stratum(incidents, 50))
             
             # Get LLM analysis on emerging patterns
             emerging_patterns = AnalyticsService._analyze_emerging_patterns(
@@ -1156,80 +1337,38 @@ class AnalyticsService:
         crime_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Use LLM to identify emerging patterns in crime data"""
+        if len(trends) < _MIN_TREND_PERIODS:
+            return []
+        
         try:
             # Prepare data for the LLM
-            trends_json = json.dumps(trends, cls=UUIDEncoder)
-            incidents_json = json.dumps(incidents[:20], cls=UUIDEncoder)  # Limit for token count
-            
-            # Create LLM prompt
-            pattern_prompt = PromptTemplate(
-                input_variables=["trends", "incidents", "start_date", "end_date", "interval", "district", "crime_type"],
-                template="""
-                You are an expert crime analyst specializing in trend identification. Based on the crime data provided,
-                identify emerging patterns and trends.
-                
-                Crime trends data (grouped by {interval}):
-                {trends}
-                
-                Sample incidents:
-                {incidents}
-                
-                Analysis period: {start_date} to {end_date}
-                Filters:
-                - District: {district}
-                - Crime Type: {crime_type}
-                
-                Identify 3-5 notable patterns in this data, including emerging trends, periodic patterns, or concerning developments.
-                For each pattern, provide:
-                1. A short descriptive name
-                2. A detailed explanation of the pattern
-                3. Supporting evidence from the data
-                4. The confidence level (as a percentage)
-                5. Potential causes
-                
-                Return your analysis as a valid JSON array with this structure:
-                ```
-                [
-                    {{
-                        "name": "Pattern name",
-                        "description": "Detailed explanation of the pattern",
-                        "evidence": "Supporting evidence from the data",
-                        "confidence": 0-100,
-                        "causes": ["Cause 1", "Cause 2"]
-                    }},
-                    ...more patterns...
-                ]
-                ```
-                
-                Ensure your analysis is data-driven and provides actionable insights.
-                """
-            )
+            # Keep the most recent periods that fit the budget, still in chronological order
+            trends_json = _dumps(_pack_by_tokens(trends[::-1], _TREND_TOKEN_BUDGET)[::-1])
+            incidents_json = _dumps(_pack_by_tokens(incidents))  # Fit the token budget
             
             # Execute LLM chain
-            chain = LLMChain(llm=llm, prompt=pattern_prompt)
             
             district_param = district if district else "all districts"
             crime_type_param = crime_type if crime_type else "all crime types"
             
-            response = chain.run(
-                trends=trends_json,
-                incidents=incidents_json,
-                start_date=start_date.isoformat(),
-                end_date=end_date.isoformat(),
-                interval=interval,
-                district=district_param,
-                crime_type=crime_type_param
+            # Identical trends and filters reuse the earlier response
+            prompt_vars = {
+                "trends": trends_json,
+                "incidents": incidents_json,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "interval": interval,
+                "district": district_param,
+                "crime_type": crime_type_param
+            }
+            response = cached_llm_run(
+                insights_cache, "emerging_patterns", prompt_vars, lambda: EMERGING_PATTERNS_CHAIN.invoke(prompt_vars)
             )
             
             # Parse LLM response
             try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    patterns_data = json.loads(json_str)
-                else:
-                    patterns_data = json.loads(response)
+                # Decode the first JSON value in the response, ignoring any surrounding prose
+                patterns_data = _parse_llm_json(response, "[")
                 
                 return patterns_data
             except json.JSONDecodeError:
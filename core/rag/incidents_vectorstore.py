@@ -2,7 +2,8 @@ from typing import List, Dict, Any
 import logging
 from uuid import UUID
 from datetime import datetime
-import json
+import hashlib
+import orjson
 
 from langchain_core.documents import Document
 from core.rag.vectore_store import VectorStore, VectorStoreConfig
@@ -11,9 +12,19 @@ from apps.incidents.models import Incident
 
 logger = logging.getLogger(__name__)
 
+def _dumps(obj: Any) -> str:
+    """Serialize incident fields for the embedded text"""
+    return orjson.dumps(obj, default=str).decode()
+
 # Store vector store instance
 _incident_vector_store = None
 
+# Documents per embedding request when adding incidents in bulk
+_EMBED_BATCH_SIZE = 64
+
+# From this many results on, similar-incident searches re-rank for diversity (MMR)
+_MMR_MIN_K = 5
+
 def get_incident_vector_store():
     """Get a dedicated vector store instance for incidents"""
     global _incident_vector_store
@@ -44,7 +55,7 @@ def incident_to_document(incident: Incident) -> Document:
     Type: {incident.type}
     Date: {date_str}
     Description: {incident.description or ""}
-    Location: {json.dumps(incident.location)}
+    Location: {_dumps(incident.location)}
     Severity: {incident.severity}
     Status: {incident.status}
     Notes: {incident.notes or ""}
@@ -52,17 +63,20 @@ def incident_to_document(incident: Incident) -> Document:
     
     # Add environmental factors if present
     if hasattr(incident, "environmental_factors") and incident.environmental_factors:
-        content += f"Environmental Factors: {json.dumps(incident.environmental_factors)}\n"
+        content += f"Environmental Factors: {_dumps(incident.environmental_factors)}\n"
     
     # Add socioeconomic factors if present
     if hasattr(incident, "socioeconomic_factors") and incident.socioeconomic_factors:
-        content += f"Socioeconomic Factors: {json.dumps(incident.socioeconomic_factors)}\n"
+        content += f"Socioeconomic Factors: {_dumps(incident.socioeconomic_factors)}\n"
 
-    # Create document with metadata for filtering
+    # Create document with metadata for filtering; the incident id doubles as the document id,
+    # so re-adding an incident overwrites its document
     return Document(
+        id=str(incident.id),
         page_content=content,
         metadata={
             "id": str(incident.id),
+            "content_hash": hashlib.blake2b(content.encode(), digest_size=16).hexdigest(),
             "type": incident.type,
             "date": date_str,
             "severity": incident.severity,
@@ -80,9 +94,26 @@ def add_incident_to_vector_store(incident: Incident) -> None:
         vector_store = get_incident_vector_store()
         document = incident_to_document(incident)
         vector_store.add_documents([document])
-        logger.info(f"Added incident {incident.id} to vector store")
+        logger.info("Added incident %s to vector store", incident.id)
+    except Exception as e:
+        logger.error("Error adding incident %s to vector store: %s", incident.id, e)
+        import traceback
+        logger.error(traceback.format_exc())
+        raise
+
+def add_incidents_to_vector_store(incidents: List[Incident], batch_size: int = _EMBED_BATCH_SIZE) -> None:
+    """Add many incidents to vector store in embedding batches of batch_size."""
+    if not incidents:
+        return
+    
+    try:
+        vector_store = get_incident_vector_store()
+        documents = [incident_to_document(incident) for incident in incidents]
+        for start in range(0, len(documents), batch_size):
+            vector_store.add_documents(documents[start:start + batch_size])
+        logger.info("Added %s incidents to vector store", len(documents))
     except Exception as e:
-        logger.error(f"Error adding incident {incident.id} to vector store: {e}")
+        logger.error("Error adding %s incidents to vector store: %s", len(incidents), e)
         import traceback
         logger.error(traceback.format_exc())
         raise
@@ -91,17 +122,23 @@ def update_incident_in_vector_store(incident: Incident) -> None:
     """Update incident in vector store by deleting and re-adding."""
     try:
         vector_store = get_incident_vector_store()
+        document = incident_to_document(incident)
+        
+        # Skip the embedding call when none of the embedded fields changed
+        existing = vector_store.get_by_ids([str(incident.id)])
+        if existing and existing[0].metadata.get("content_hash") == document.metadata["content_hash"]:
+            logger.info("Incident %s content unchanged, vector store not updated", incident.id)
+            return
         
         # Delete the existing document
         vector_store.delete(filter={"id": str(incident.id)})
         
         # Add the updated document
-        document = incident_to_document(incident)
         vector_store.add_documents([document])
         
-        logger.info(f"Updated incident {incident.id} in vector store")
+        logger.info("Updated incident %s in vector store", incident.id)
     except Exception as e:
-        logger.error(f"Error updating incident {incident.id} in vector store: {e}")
+        logger.error("Error updating incident %s in vector store: %s", incident.id, e)
         import traceback
         logger.error(traceback.format_exc())
         raise
@@ -111,9 +148,9 @@ def delete_incident_from_vector_store(incident_id: UUID) -> None:
     try:
         vector_store = get_incident_vector_store()
         vector_store.delete(filter={"id": str(incident_id)})
-        logger.info(f"Deleted incident {incident_id} from vector store")
+        logger.info("Deleted incident %s from vector store", incident_id)
     except Exception as e:
-        logger.error(f"Error deleting incident {incident_id} from vector store: {e}")
+        logger.error("Error deleting incident %s from vector store: %s", incident_id, e)
         import traceback
         logger.error(traceback.format_exc())
         raise
@@ -128,8 +165,14 @@ def get_similar_incidents(query: str, filters: Dict[str, Any] = None, k: int = 5
         if filters:
             search_filter = filters
             
-        # Perform similarity search
-        documents = vector_store.similarity_search(query, k=k, filter=search_filter)
+        # Larger result sets skip near-duplicate incidents; the candidate query is bounded by
+        # fetch_k, so selective filters with few matches only return what exists
+        if k >= _MMR_MIN_K:
+            documents = vector_store.max_marginal_relevance_search(
+                query, k=k, fetch_k=4 * k, lambda_mult=0.5, filter=search_filter
+            )
+        else:
+            documents = vector_store.similarity_search(query, k=k, filter=search_filter)
         
         # Extract and return incident IDs and metadata
         return [
@@ -144,7 +187,7 @@ def get_similar_incidents(query: str, filters: Dict[str, Any] = None, k: int = 5
             for doc in documents
         ]
     except Exception as e:
-        logger.error(f"Error searching for similar incidents: {e}")
+        logger.error("Error searching for similar incidents: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         return []
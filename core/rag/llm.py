@@ -1,5 +1,10 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 
+# One module-level client per model: each keeps a long-lived gRPC channel, so TLS and auth
+# are paid once per process. ainvoke/abatch on the same instances use a grpc_asyncio client
 llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro",
-                 temperature=0.7, top_p=0.85)
\ No newline at end of file
+                 temperature=0.7, top_p=0.85, transport="grpc")
+
+# Cheaper, faster model for high-volume preprocessing and short structured analyses
+llm_flash = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0, transport="grpc")
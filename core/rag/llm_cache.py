@@ -0,0 +1,34 @@
+import logging
+from typing import Any, Callable, Dict
+
+from core.utils.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Predictions go stale faster than descriptive insights over the same data
+prediction_cache = ResponseCache(maxsize=128, ttl=60 * 60)
+insights_cache = ResponseCache(maxsize=256, ttl=6 * 60 * 60)
+
+# Finished prediction payloads keyed by a (data fingerprint, parameters) key
+prediction_result_cache = ResponseCache(maxsize=128, ttl=60 * 60)
+
+def cached_llm_run(
+    cache: ResponseCache,
+    prompt_name: str,
+    variables: Dict[str, Any],
+    run: Callable[[], str]
+) -> str:
+    """Return the cached LLM response for identical prompt variables, calling run() on a miss"""
+    key = cache.make_key(prompt_name, **variables)
+    response = cache.get(key)
+    if response is not None:
+        logger.debug("LLM cache hit for %s", prompt_name)
+        return response
+
+    response = run()
+
+    # Only keep responses that look like the JSON every caller expects
+    if response and "{" in response:
+        cache.set(key, response)
+
+    return response
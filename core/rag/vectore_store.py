@@ -204,6 +204,35 @@ class VectorStore:
             logger.error(f"Error in similarity search: {e}")
             raise
     
+    def max_marginal_relevance_search(
+        self, 
+        query: str, 
+        k: int = 4, 
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        Perform a diversity-aware (MMR) search.
+        
+        Args:
+            query: Query text
+            k: Number of results to return
+            fetch_k: Number of nearest candidates to re-rank
+            lambda_mult: Trade-off between relevance (1) and diversity (0)
+            filter: Metadata filter to apply
+            
+        Returns:
+            List of document objects
+        """
+        try:
+            return self.vector_store.max_marginal_relevance_search(
+                query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+            )
+        except Exception as e:
+            logger.error(f"Error in max marginal relevance search: {e}")
+            raise
+    
     def similarity_search_with_score(
         self, 
         query: str, 
@@ -248,6 +277,22 @@ class VectorStore:
             logger.error(f"Error adding documents: {e}")
             raise
     
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        """
+        Fetch stored documents by ID without embedding anything.
+        
+        Args:
+            ids: List of document IDs
+            
+        Returns:
+            List of the documents found (missing IDs are skipped)
+        """
+        try:
+            return self.vector_store.get_by_ids(ids)
+        except Exception as e:
+            logger.error(f"Error fetching documents by id: {e}")
+            raise
+    
     def add_texts(
         self, 
         texts: List[str],
@@ -0,0 +1,40 @@
+import hashlib
+import threading
+from typing import Any, Optional
+
+import orjson
+from cachetools import TTLCache
+
+class ResponseCache:
+    """Thread-safe in-process TTL cache for formatted responses"""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 60):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prefix: str, **params: Any) -> str:
+        """Build a stable cache key from a prefix and request parameters"""
+        payload = orjson.dumps(params, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        return f"{prefix}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None on a miss"""
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under the given key"""
+        with self._lock:
+            self._cache[key] = value
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drop every entry whose key starts with prefix (all entries by default)"""
+        with self._lock:
+            if not prefix:
+                self._cache.clear()
+                return
+
+            for key in [k for k in self._cache.keys() if k.startswith(prefix)]:
+                self._cache.pop(key, None)
@@ -1,6 +1,9 @@
-from typing import Dict, Any, Optional, List, TypeVar, Generic
+from typing import Dict, Any, Optional, List, TypeVar, Generic, Tuple
 from datetime import datetime, date
 from uuid import UUID
+import base64
+import hashlib
+from fastapi import Request, Response
 
 T = TypeVar('T')
 
@@ -64,6 +67,19 @@ def paginate_response(
         }
     }
 
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        created_at, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 def ensure_uuid(uuid_value):
     """
     Ensure a value is a UUID object
@@ -76,4 +92,20 @@ def ensure_uuid(uuid_value):
     """
     if isinstance(uuid_value, str):
         return UUID(uuid_value)
-    return uuid_value
\ No newline at end of file
+    return uuid_value
+
+def make_etag(content: bytes) -> str:
+    """Build a strong ETag for a response body"""
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
+def etag_json_response(request: Request, content: bytes, etag: str, max_age: int = 60) -> Response:
+    """Serve pre-serialized JSON, answering 304 when the client already holds this ETag"""
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -106,8 +106,25 @@ async def get_current_user(
     
     return user
 
+def _build_permission_set(permissions: Any) -> frozenset:
+    """Normalize stored permissions (dict of flags or list of names) to a frozenset"""
+    if isinstance(permissions, dict):
+        return frozenset(name for name, granted in permissions.items() if granted)
+    return frozenset(permissions or ())
+
+def permission_set(user: User) -> frozenset:
+    """Return the user's permissions as a frozenset, built on first use and cached on the instance"""
+    # Cached per User object (i.e. per request), so repeated authz checks are O(1) set lookups
+    cached = getattr(user, "_permission_set", None)
+    if cached is None:
+        cached = _build_permission_set(user.permissions)
+        user._permission_set = cached
+    return cached
+
 def check_permissions(required_permissions: List[str]):
     """Check if user has required permissions"""
+    required = frozenset(required_permissions)
+    
     async def _check_permissions(
         current_user: User = Depends(get_current_user)
     ) -> User:
@@ -116,10 +133,7 @@ def check_permissions(required_permissions: List[str]):
             return current_user
         
         # Check if user has all required permissions
-        user_permissions = current_user.permissions or {}
-        user_permission_keys = list(user_permissions.keys()) if isinstance(user_permissions, dict) else []
-        
-        if not all(perm in user_permission_keys for perm in required_permissions):
+        if not required <= permission_set(current_user):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail={
@@ -10,7 +10,7 @@ sys.path.append(str(project_root))
 
 from sqlmodel import Session, SQLModel, create_engine
 from uuid import UUID, uuid4
-from apps.incidents.models import Incident
+from apps.incidents.services import IncidentService
 from core.utils.common import ensure_uuid
 from dotenv import load_dotenv
 load_dotenv()
@@ -95,42 +95,21 @@ def import_csv_to_db(file_path):
     # Read CSV data
     rows = read_csv_data(file_path)
     
-    # Transform data into incidents
+    # Transform data into incident mappings
     incidents = []
     for row in rows:
         try:
-            incident_data = transform_row_to_incident(row)
-            # Create Incident object
-            incident = Incident(
-                id=incident_data["id"],  # Already a UUID object
-                title=incident_data["title"],
-                description=incident_data["description"],
-                type=incident_data["type"],
-                date=incident_data["date"],
-                location=incident_data["location"],
-                severity=incident_data["severity"],
-                status=incident_data["status"],
-                environmental_factors=incident_data["environmental_factors"],
-                socioeconomic_factors=incident_data["socioeconomic_factors"],
-                created_at=incident_data["created_at"],
-                updated_at=incident_data["updated_at"]
-            )
-            incidents.append(incident)
+            incidents.append(transform_row_to_incident(row))
         except Exception as e:
             print(f"Error processing row: {e}")
             continue
     
-    # Save to database
+    # Save to database with a single bulk INSERT; the app indexes vectors on startup
     with Session(engine) as session:
-        for incident in incidents:
-            session.add(incident)
-        
-        # Commit to DB
         try:
-            session.commit()
+            IncidentService.bulk_create(session, incidents, sync_vector_store=False)
             print(f"Successfully imported {len(incidents)} incidents")
         except Exception as e:
-            session.rollback()
             print(f"Error committing to database: {e}")
             
     print(f"Import complete: {len(incidents)} records processed")